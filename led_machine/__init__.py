@@ -1,15 +1,24 @@
 import json
 import time
 from pathlib import Path
+from typing import Optional, List, Dict
 
-from led_machine.alter import AlterDim, AlterMultiplexer, LedMetadata, AlterNothing
+import numpy as np
+
+from led_machine.alter import Alter, AlterDim, AlterMultiplexer, LedMetadata, AlterNothing
 from led_machine.block import AlterBlock
 from led_machine.color import ColorConstants
 from led_machine.color_parse import parse_colors
+from led_machine.frame import FrameBuffer
 from led_machine.handler import LedState, handle_message, MessageContext, LedConstants, START_PIXELS_TO_HIDE
+from led_machine.output import PixelOutput
+from led_machine.parallel import ParallelRenderer
 from led_machine.partition import AlterPartition
 from led_machine.percent import ReversingPercentGetter, BouncePercentGetter, MultiplierPercentGetter, \
     PercentGetterHolder, PercentGetterTimeMultiplier, ConstantPercentGetter, SumPercentGetter, SmoothPercentGetter
+from led_machine.plan import compile_alter, RenderPlan
+from led_machine.profiling import Profiler
+from led_machine.scheduler import FrameScheduler
 from led_machine.slack import SlackHelper
 
 NUMBER_OF_PIXELS = 450
@@ -18,6 +27,27 @@ NUMBER_OF_PIXELS = 450
 # TODO most of these imports are used in main. They pollute the namespace and confuse people. Do something about it eventually
 
 
+def create_led_states() -> Dict[str, LedState]:
+    """
+    :return: Each LedState that messages can change, by name
+    """
+    josh_lamp_led_state = LedState(NUMBER_OF_PIXELS)
+    josh_lamp_led_state.main_alter = AlterNothing()
+    return {"main": LedState(NUMBER_OF_PIXELS), "josh_lamp": josh_lamp_led_state}
+
+
+def create_setting(led_states: Dict[str, LedState]) -> Alter:
+    main_led_state = led_states["main"]
+    josh_lamp_led_state = led_states["josh_lamp"]
+    return AlterMultiplexer([
+        main_led_state.main_alter,
+        main_led_state.pattern_alter,
+        AlterPartition([(AlterMultiplexer([
+            josh_lamp_led_state.main_alter, josh_lamp_led_state.pattern_alter
+        ]), [(START_PIXELS_TO_HIDE, 17), (NUMBER_OF_PIXELS - 19, 19)])]),
+    ])
+
+
 def main():
     import board
     import neopixel
@@ -26,76 +56,128 @@ def main():
         neopixel.NeoPixel(board.D18, NUMBER_OF_PIXELS),  # AKA GPIO 18
     ]
     pixels_list[0].auto_write = False
+    positions_list = [np.arange(len(pixels)) for pixels in pixels_list]
+    buffer_list = [FrameBuffer(len(pixels)) for pixels in pixels_list]
 
     with Path("config.json").open() as file:
         config = json.load(file)
 
+    output_list = [
+        PixelOutput(pixels, brightness=0.8, gamma=config.get("gamma", 1.0), dither=config.get("dither", False))
+        for pixels in pixels_list
+    ]
+
     slack_bot_token = config["slack_bot_token"]  # xoxb-***
     slack_app_token = config["slack_app_token"]  # xapp-***
     slack_channel = config["slack_channel"]
     slack_helper = SlackHelper(slack_bot_token, slack_app_token, slack_channel)
+    scheduler = FrameScheduler(config.get("target_fps", 60.0), catch_up=config.get("catch_up_frames", False))
+    profiler: Optional[Profiler] = Profiler() if config.get("profile", False) else None
+    """Only used when profiling is enabled, so that rendering has no extra overhead otherwise"""
 
-    main_led_state = LedState(NUMBER_OF_PIXELS)
-
-    josh_lamp_led_state = LedState(NUMBER_OF_PIXELS)
-    josh_lamp_led_state.main_alter = AlterNothing()
-    alter_dim = AlterDim(0.8)
     # dimmer_percent_getter = PercentGetterHolder(ConstantPercentGetter(1.0))
     # """A percent getter which stores a percent getter that dynamically controls the brightness of the lights."""
-    """A value that is changed when requested by the user"""
-    while True:
-        for message in slack_helper.new_messages():
-            text: str = message["text"].lower()
-            print(f"Got text: {repr(text)}")
-            context = MessageContext()
-
-            used_led_state = main_led_state
-            is_lamp = "lamp" in text
-            if is_lamp:
-                if "josh" in text:
-                    used_led_state = josh_lamp_led_state
-            handle_message(text, used_led_state, is_lamp, context)
-
-            dim_setting = None
-            if "bright" in text:
-                dim_setting = 1.0
-            elif "normal" in text:
-                dim_setting = 0.8
-            elif "dim" in text:
-                dim_setting = 0.3 * 0.8
-            elif "dark" in text:
-                dim_setting = 0.07 * 0.8
-            elif "sleep" in text:
-                dim_setting = 0.01 * 0.8
-            elif "skyline" in text or "sky line" in text or "sky-line" in text:
-                dim_setting = 0.005
-            else:
-                if context.reset and not is_lamp:
+    hidden_mask_list = [positions < START_PIXELS_TO_HIDE for positions in positions_list]
+    plan_list: Optional[List[RenderPlan]] = None
+    """The compiled plan for each element in pixels_list. This is None when it needs to be compiled again."""
+    renderer_list: List[ParallelRenderer] = []
+    """When rendering with more than one worker, the renderer for each element in pixels_list. Otherwise empty."""
+    render_workers = config.get("render_workers", 1)
+    if render_workers > 1:
+        renderer_list = [
+            ParallelRenderer(len(pixels), render_workers, create_led_states, create_setting, hidden_mask)
+            for pixels, hidden_mask in zip(pixels_list, hidden_mask_list)
+        ]
+        buffer_list = [renderer.buffer for renderer in renderer_list]
+        if profiler is not None:
+            print("Profiling is not supported when rendering with more than one worker")
+            profiler = None
+    led_states: Optional[Dict[str, LedState]] = None if renderer_list else create_led_states()
+    """The state of the patterns to render. When rendering with more than one worker, each worker has its own copy instead."""
+    try:
+        while True:
+            scheduler.wait()
+            for message in slack_helper.new_messages():
+                text: str = message["text"].lower()
+                print(f"Got text: {repr(text)}")
+                if text.strip() == "stats":
+                    print(scheduler)
+                    for output in output_list:
+                        print(output)
+                    print(profiler.report() if profiler is not None else "Send \"profile\" to enable profiling")
+                    continue
+                if text.strip() == "profile":
+                    if renderer_list:
+                        print("Profiling is not supported when rendering with more than one worker")
+                        continue
+                    profiler = None if profiler is not None else Profiler()
+                    print(f"Profiling is now {'enabled' if profiler is not None else 'disabled'}")
+                    plan_list = None
+                    continue
+                context = MessageContext()
+
+                used_led_state_name = "main"
+                is_lamp = "lamp" in text
+                if is_lamp:
+                    if "josh" in text:
+                        used_led_state_name = "josh_lamp"
+                if led_states is not None:
+                    handle_message(text, led_states[used_led_state_name], is_lamp, context)
+                for renderer in renderer_list:
+                    context = renderer.handle_message(used_led_state_name, text, is_lamp)
+
+                dim_setting = None
+                if "bright" in text:
+                    dim_setting = 1.0
+                elif "normal" in text:
                     dim_setting = 0.8
-            if dim_setting is not None:
-                alter_dim.dim = dim_setting
-
-        seconds = time.time()
-
-        setting = AlterMultiplexer([
-            main_led_state.main_alter,
-            main_led_state.pattern_alter,
-            AlterPartition([(AlterMultiplexer([
-                josh_lamp_led_state.main_alter, josh_lamp_led_state.pattern_alter
-            ]), [(START_PIXELS_TO_HIDE, 17), (NUMBER_OF_PIXELS - 19, 19)])]),
-            AlterBlock([(ColorConstants.BLACK, START_PIXELS_TO_HIDE), (None, NUMBER_OF_PIXELS - START_PIXELS_TO_HIDE)], ConstantPercentGetter(0.0), fade=False),
-            alter_dim
-        ])
-        # setting.dim = DIM * dim_setting * dimmer_percent_getter.get_percent(seconds)
-        metadata = LedMetadata()
-        for pixels in pixels_list:
-            for i in range(len(pixels)):
-                pixels[i] = setting.alter_pixel(seconds, i, None, metadata) or ColorConstants.BLACK
-
-        for pixels in pixels_list:
-            pixels.show()
-
-        time.sleep(.001)
+                elif "dim" in text:
+                    dim_setting = 0.3 * 0.8
+                elif "dark" in text:
+                    dim_setting = 0.07 * 0.8
+                elif "sleep" in text:
+                    dim_setting = 0.01 * 0.8
+                elif "skyline" in text or "sky line" in text or "sky-line" in text:
+                    dim_setting = 0.005
+                else:
+                    if context.reset and not is_lamp:
+                        dim_setting = 0.8
+                if dim_setting is not None:
+                    for output in output_list:
+                        output.brightness = dim_setting
+                plan_list = None  # The state may have changed
+
+            seconds = time.time()
+            if renderer_list:
+                for renderer in renderer_list:
+                    renderer.start_frame(seconds)
+                for renderer in renderer_list:
+                    renderer.finish_frame()
+                for output, buffer in zip(output_list, buffer_list):
+                    output.write(buffer)
+                continue
+
+            if plan_list is None:
+                setting = compile_alter(create_setting(led_states))
+                if profiler is not None:
+                    setting = profiler.instrument(setting)
+                plan_list = [RenderPlan(setting, hidden_mask) for hidden_mask in hidden_mask_list]
+
+            # setting.dim = DIM * dim_setting * dimmer_percent_getter.get_percent(seconds)
+            metadata = LedMetadata()
+            setting.begin_frame(seconds)  # every plan shares the same setting, so this is only done once
+            for positions, buffer, plan in zip(positions_list, buffer_list, plan_list):
+                buffer.clear()
+                plan.render(seconds, positions, buffer, metadata)
+            setting.end_frame()
+            if profiler is not None:
+                profiler.end_frame()
+
+            for output, buffer in zip(output_list, buffer_list):
+                output.write(buffer)
+    finally:
+        for renderer in renderer_list:
+            renderer.close()
 
 
 if __name__ == '__main__':
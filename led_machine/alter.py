@@ -1,8 +1,11 @@
 from abc import abstractmethod, ABC
 from typing import Optional, List, Union, Callable
 
+import numpy as np
+
 from led_machine.color import Color, ColorAlias
-from led_machine.types import TimeMultiplierGetter
+from led_machine.frame import FrameBuffer
+from led_machine.types import TimeMultiplierGetter, STOPPED_TIME_MULTIPLIER
 
 Position = Union[int, float]
 
@@ -11,7 +14,7 @@ class LedMetadata:
     """
     This may be used in the future
     """
-    pass
+    __slots__ = ()
 
 
 class Alter(ABC):
@@ -27,11 +30,53 @@ class Alter(ABC):
         """
         pass
 
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        """
+        Alters many pixels at once. By default, this calls :meth:`alter_pixel` for each position,
+        so subclasses should override this when they are able to do the same thing with NumPy.
+
+        :param seconds: The same as the seconds passed to :meth:`alter_pixel`
+        :param positions: A 1D array of pixel positions
+        :param buffer: A buffer the same length as positions containing the current color of each position. This is altered in place.
+        :param metadata:
+        """
+        for i, pixel_position in enumerate(positions.tolist()):
+            buffer.set_color(i, self.alter_pixel(seconds, pixel_position, buffer.get_color(i), metadata))
+
+    def begin_frame(self, seconds: float) -> None:
+        """
+        Called exactly once before each frame, before :meth:`render` or :meth:`alter_pixel` are called with the same seconds.
+        Alters that have state should update it here, so that rendering only has to read it.
+        Alters that are composed of other alters (or percent getters) must pass this on to them.
+
+        :param seconds: The same as the seconds passed to :meth:`alter_pixel`
+        """
+        pass
+
+    def end_frame(self) -> None:
+        """
+        Called exactly once after each frame has been rendered. Alters that are composed of other alters must pass this on to them.
+        """
+        pass
+
+    def is_static(self) -> bool:
+        """
+        :return: True if this alter gives the same result no matter what seconds is. When True, a rendered frame may be reused
+        until this alter is changed. The result may change when a time multiplier changes.
+        """
+        return False
+
 
 class AlterNothing(Alter):
     def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
         return current_color
 
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        pass
+
+    def is_static(self) -> bool:
+        return True
+
 
 class AlterDim(Alter):
     def __init__(self, dim: float):
@@ -42,6 +87,16 @@ class AlterDim(Alter):
             return None
         return current_color.scale(self.dim)
 
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        if self.dim < 0:
+            raise ValueError(f"dim cannot be negative! dim: {self.dim}")
+        if self.dim > 1:
+            raise ValueError(f"dim cannot be greater than 1! dim: {self.dim}")
+        buffer.colors *= self.dim
+
+    def is_static(self) -> bool:
+        return True
+
 
 class AlterSolid(Alter):
     def __init__(self, color: ColorAlias):
@@ -50,14 +105,40 @@ class AlterSolid(Alter):
     def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
         return self.color
 
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        buffer.fill(self.color)
+
+    def is_static(self) -> bool:
+        return True
+
 
 class AlterSpeedOfAlter(Alter):
     def __init__(self, alter: Alter, time_multiplier_getter: TimeMultiplierGetter):
         self.alter = alter
         self.time_multiplier_getter = time_multiplier_getter
+        self.last_seconds: Optional[float] = None
+        self.last_time_multiplier = 1.0
+
+    def _get_time_multiplier(self, seconds: float) -> float:
+        if seconds != self.last_seconds:  # only call time_multiplier_getter once per frame
+            self.last_time_multiplier = self.time_multiplier_getter()
+            self.last_seconds = seconds
+        return self.last_time_multiplier
 
     def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
-        return self.alter.alter_pixel(seconds * self.time_multiplier_getter(), pixel_position, current_color, metadata)
+        return self.alter.alter_pixel(seconds * self._get_time_multiplier(seconds), pixel_position, current_color, metadata)
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        self.alter.render(seconds * self._get_time_multiplier(seconds), positions, buffer, metadata)
+
+    def begin_frame(self, seconds: float) -> None:
+        self.alter.begin_frame(seconds * self._get_time_multiplier(seconds))
+
+    def end_frame(self) -> None:
+        self.alter.end_frame()
+
+    def is_static(self) -> bool:
+        return self.time_multiplier_getter() <= STOPPED_TIME_MULTIPLIER or self.alter.is_static()
 
 
 class AlterMultiplexer(Alter):
@@ -69,6 +150,21 @@ class AlterMultiplexer(Alter):
             current_color = alter.alter_pixel(seconds, pixel_position, current_color, metadata)
         return current_color
 
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        for alter in self.alters:
+            alter.render(seconds, positions, buffer, metadata)
+
+    def begin_frame(self, seconds: float) -> None:
+        for alter in self.alters:
+            alter.begin_frame(seconds)
+
+    def end_frame(self) -> None:
+        for alter in self.alters:
+            alter.end_frame()
+
+    def is_static(self) -> bool:
+        return all(alter.is_static() for alter in self.alters)
+
     def __str__(self):
         return f"AlterMultiplexer(alters={self.alters})"
 
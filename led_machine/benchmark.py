@@ -0,0 +1,361 @@
+"""
+Renders each pattern without any LED hardware to measure how fast it is.
+
+Usage: python -m led_machine.benchmark [patterns|colors|parse|memory|parallel] [--save results.json] [--compare results.json]
+"""
+import argparse
+import multiprocessing
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from led_machine.alter import Alter, AlterMultiplexer, LedMetadata
+from led_machine.color import Color, RawColor
+from led_machine.color_parse import parse_colors, _parse_colors, _parse_word
+from led_machine.frame import FrameBuffer
+from led_machine.handler import LedState, handle_message, MessageContext, START_PIXELS_TO_HIDE, STORM1
+from led_machine.northern_lights import Chunk
+from led_machine.output import PixelOutput
+from led_machine.parallel import ParallelRenderer
+from led_machine.parse.token import StaticToken, StringToken, OrganizerToken
+from led_machine.plan import compile_alter, RenderPlan
+from led_machine.randomness import seed_random
+
+PATTERNS: Dict[str, str] = {
+    "solid": "red",
+    "rainbow": "rainbow",
+    "fade": "red green blue",
+    "pixel": "pixel red green blue",
+    "carnival": "carnival",
+    "bounce": "bounce",
+    "star": "star",
+    "reverse_star": "reverse star",
+    "twinkle": "twinkle",
+    "northern_lights": "north red blue green",
+    "blend": "red green ~ blue purple",
+    "partition": "red | blue green | rainbow",
+    "storm": "storm1",
+}
+"""The name of each pattern mapped to the message that creates it"""
+
+PIXEL_COUNTS = [450, 2000, 10000]
+WORKER_COUNTS = [1, 2, 3, 4]
+FRAME_SECONDS = 1 / 60
+"""The number of simulated seconds between frames, so that each run renders exactly the same frames"""
+START_SECONDS = 1618793494.672
+RANDOM_SEED = 0
+"""Patterns are created right after seeding, so that patterns that use randomness render the same frames each run"""
+REGRESSION_THRESHOLD = 0.9
+"""A result is reported as a regression when its frames per second is less than this fraction of the baseline"""
+
+
+class FakePixels:
+    """
+    Acts like a NeoPixel, but doesn't need any hardware
+    """
+    def __init__(self, number_of_pixels: int):
+        self.data: List[Tuple[int, int, int]] = [(0, 0, 0)] * number_of_pixels
+        self.show_count = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def show(self):
+        self.show_count += 1
+
+
+def create_benchmark_led_states(number_of_pixels: int) -> Dict[str, LedState]:
+    return {"main": LedState(number_of_pixels)}
+
+
+def create_benchmark_setting(led_states: Dict[str, LedState]) -> Alter:
+    return AlterMultiplexer([led_states["main"].main_alter, led_states["main"].pattern_alter])
+
+
+class PatternRunner:
+    """
+    Renders a single pattern to a :class:`FakePixels` the same way main() does
+    """
+    def __init__(self, message: str, number_of_pixels: int):
+        seed_random(RANDOM_SEED)
+        led_states = create_benchmark_led_states(number_of_pixels)
+        handle_message(message, led_states["main"], False, MessageContext())
+        self.positions = np.arange(number_of_pixels)
+        self.plan = RenderPlan(compile_alter(create_benchmark_setting(led_states)), self.positions < START_PIXELS_TO_HIDE)
+        self.buffer = FrameBuffer(number_of_pixels)
+        self.pixels = FakePixels(number_of_pixels)
+        self.output = PixelOutput(self.pixels, brightness=0.8)
+        self.frame = 0
+
+    def render_frame(self):
+        seconds = START_SECONDS + self.frame * FRAME_SECONDS
+        self.frame += 1
+        self.buffer.clear()
+        self.plan.alter.begin_frame(seconds)
+        self.plan.render(seconds, self.positions, self.buffer, LedMetadata())
+        self.plan.alter.end_frame()
+        self.output.write(self.buffer)
+
+
+def measure_pattern(message: str, number_of_pixels: int, min_seconds: float, max_frames: int) -> Dict[str, float]:
+    runner = PatternRunner(message, number_of_pixels)
+    runner.render_frame()  # the first frame may do some extra setup
+
+    frames = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while frames < 3 or (elapsed < min_seconds and frames < max_frames):
+        runner.render_frame()
+        frames += 1
+        elapsed = time.perf_counter() - start
+
+    # tracemalloc slows everything down, so memory is measured separately from speed.
+    # This is the most memory in use at once while rendering a frame, not the number of allocations.
+    allocation_frames = 3
+    tracemalloc.start()
+    peak_total = 0
+    for _ in range(allocation_frames):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        runner.render_frame()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+    tracemalloc.stop()
+
+    return {
+        "fps": frames / elapsed,
+        "frames": frames,
+        "peak_traced_kib_per_frame": peak_total / allocation_frames / 1024,
+    }
+
+
+def benchmark_patterns(pattern_names: List[str], pixel_counts: List[int], min_seconds: float, max_frames: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    :return: A dictionary of pattern name -> number of pixels (as a string) -> measurements
+    """
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    print(f"{'pattern':<18} {'pixels':>7} {'fps':>10} {'peak KiB':>10}")
+    for name in pattern_names:
+        results[name] = {}
+        for number_of_pixels in pixel_counts:
+            result = measure_pattern(PATTERNS[name], number_of_pixels, min_seconds, max_frames)
+            results[name][str(number_of_pixels)] = result
+            print(f"{name:<18} {number_of_pixels:>7} {result['fps']:>10.1f} {result['peak_traced_kib_per_frame']:>10.1f}")
+    return results
+
+
+def benchmark_colors(iterations: int) -> Dict[str, float]:
+    """
+    Measures the operations that lerp and scale heavy patterns (northern lights, blend, stars) do for each pixel.
+    :return: A dictionary of operation name -> operations per second
+    """
+    left = Color.from_bytes(255, 45, 0)
+    right = Color.from_bytes(0, 0, 255)
+    operations = {
+        "checked_constructor": lambda: Color(0.5, 0.25, 0.75),
+        "unchecked_constructor": lambda: Color.create_unchecked(0.5, 0.25, 0.75),
+        "from_bytes": lambda: Color.from_bytes(255, 45, 0),
+        "lerp": lambda: left.lerp(right, 0.3),
+        "scale": lambda: left.scale(0.3),
+        "lerp_scale_tuple": lambda: left.lerp(right, 0.3).scale(0.8).tuple,
+    }
+    results: Dict[str, float] = {}
+    print(f"{'operation':<24} {'ops/sec':>12}")
+    for name, operation in operations.items():
+        results[name] = iterations / timeit.timeit(operation, number=iterations)
+        print(f"{name:<24} {results[name]:>12.0f}")
+    return results
+
+
+def benchmark_parse(iterations: int) -> Dict[str, float]:
+    """
+    Measures how long it takes to parse the colors of STORM1, which is the longest message that is commonly sent.
+    :return: A dictionary of measurement name -> milliseconds per parse
+    """
+    def parse_uncached():
+        _parse_colors.cache_clear()
+        _parse_word.cache_clear()
+        parse_colors(STORM1)
+
+    measurements = {
+        "storm1_uncached": parse_uncached,
+        "storm1_cached": lambda: parse_colors(STORM1),
+        "storm1_handle_message": lambda: handle_message("storm1", LedState(450), False, MessageContext()),
+    }
+    results: Dict[str, float] = {}
+    print(f"{'measurement':<24} {'ms':>10}")
+    for name, measurement in measurements.items():
+        results[name] = timeit.timeit(measurement, number=iterations) / iterations * 1000
+        print(f"{name:<24} {results[name]:>10.3f}")
+    return results
+
+
+def get_object_size(obj) -> int:
+    """
+    :return: The number of bytes an object takes up, including its __dict__ if it has one
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def measure_pattern_memory(message: str, number_of_pixels: int, frames: int) -> Dict[str, float]:
+    """
+    This should be called in a fresh process so that the peak RSS only includes this pattern.
+    """
+    import resource  # only available on POSIX, so it is not imported with the rest of the module
+    tracemalloc.start()
+    runner = PatternRunner(message, number_of_pixels)
+    for _ in range(frames):
+        runner.render_frame()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,  # kilobytes on Linux
+        "peak_traced_kib": peak / 1024,
+    }
+
+
+def benchmark_memory(pattern_names: List[str], pixel_counts: List[int], frames: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Measures the size of objects that patterns create many of, then the peak memory of each pattern.
+    :return: A dictionary of pattern name -> number of pixels (as a string) -> measurements.
+    Object sizes are under the "objects" key.
+    """
+    objects = {
+        "RawColor": RawColor(1, 2, 3),
+        "Color": Color(0.5, 0.25, 0.75),
+        "Chunk": Chunk(Color(0.5, 0.25, 0.75)),
+        "StaticToken": StaticToken("red", "red"),
+        "StringToken": StringToken("red"),
+        "OrganizerToken": OrganizerToken([]),
+    }
+    results: Dict[str, Dict[str, Dict[str, float]]] = {"objects": {}}
+    print(f"{'object':<18} {'bytes':>7}")
+    for name, obj in objects.items():
+        size = get_object_size(obj)
+        results["objects"][name] = {"bytes": size}
+        print(f"{name:<18} {size:>7}")
+
+    print(f"{'pattern':<18} {'pixels':>7} {'RSS KiB':>10} {'traced KiB':>10}")
+    # each measurement gets its own process, otherwise the peak RSS would never go down
+    context = multiprocessing.get_context("spawn")
+    for name in pattern_names:
+        results[name] = {}
+        for number_of_pixels in pixel_counts:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(measure_pattern_memory, PATTERNS[name], number_of_pixels, frames).result()
+            results[name][str(number_of_pixels)] = result
+            print(f"{name:<18} {number_of_pixels:>7} {result['peak_rss_kib']:>10} {result['peak_traced_kib']:>10.1f}")
+    return results
+
+
+def measure_parallel(message: str, number_of_pixels: int, workers: int, min_seconds: float, max_frames: int) -> Dict[str, float]:
+    renderer = ParallelRenderer(
+        number_of_pixels, workers, partial(create_benchmark_led_states, number_of_pixels), create_benchmark_setting,
+        np.arange(number_of_pixels) < START_PIXELS_TO_HIDE, seed=RANDOM_SEED
+    )
+    try:
+        renderer.handle_message("main", message, False)
+        renderer.render(START_SECONDS)  # the first frame may do some extra setup
+
+        frames = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while frames < 3 or (elapsed < min_seconds and frames < max_frames):
+            frames += 1
+            renderer.render(START_SECONDS + frames * FRAME_SECONDS)
+            elapsed = time.perf_counter() - start
+    finally:
+        renderer.close()
+    return {"fps": frames / elapsed, "frames": frames}
+
+
+def benchmark_parallel(pattern_names: List[str], pixel_counts: List[int], worker_counts: List[int], min_seconds: float,
+                       max_frames: int) -> Dict[str, Dict[str, Dict[str, Dict[str, float]]]]:
+    """
+    Measures how rendering scales with the number of worker processes. This does not include writing to the pixels.
+    :return: A dictionary of pattern name -> number of pixels (as a string) -> number of workers (as a string) -> measurements
+    """
+    results: Dict[str, Dict[str, Dict[str, Dict[str, float]]]] = {}
+    print(f"{'pattern':<18} {'pixels':>7} {'workers':>7} {'fps':>10} {'speedup':>8}")
+    for name in pattern_names:
+        results[name] = {}
+        for number_of_pixels in pixel_counts:
+            results[name][str(number_of_pixels)] = {}
+            baseline_fps: Optional[float] = None
+            for workers in worker_counts:
+                result = measure_parallel(PATTERNS[name], number_of_pixels, workers, min_seconds, max_frames)
+                results[name][str(number_of_pixels)][str(workers)] = result
+                if baseline_fps is None:
+                    baseline_fps = result["fps"]
+                print(f"{name:<18} {number_of_pixels:>7} {workers:>7} {result['fps']:>10.1f} {result['fps'] / baseline_fps:>7.2f}x")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Dict[str, float]]], baseline: Dict[str, Dict[str, Dict[str, float]]]) -> bool:
+    """
+    Prints how each result compares to the baseline.
+    :return: True if there were any regressions
+    """
+    any_regression = False
+    for name, pixel_results in results.items():
+        for pixels, result in pixel_results.items():
+            baseline_result: Optional[Dict[str, float]] = baseline.get(name, {}).get(pixels)
+            if baseline_result is None:
+                continue
+            ratio = result["fps"] / baseline_result["fps"]
+            regression = ratio < REGRESSION_THRESHOLD
+            any_regression = any_regression or regression
+            print(f"{name:<18} {pixels:>7} {ratio:>9.2f}x{'  REGRESSION' if regression else ''}")
+    return any_regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks each pattern without any LED hardware")
+    parser.add_argument("suite", nargs="?", choices=["patterns", "colors", "parse", "memory", "parallel"], default="patterns")
+    parser.add_argument("--patterns", nargs="+", choices=list(PATTERNS), default=list(PATTERNS))
+    parser.add_argument("--pixels", nargs="+", type=int, default=PIXEL_COUNTS)
+    parser.add_argument("--workers", nargs="+", type=int, default=WORKER_COUNTS, help="The numbers of worker processes to use for the parallel suite")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="The minimum number of seconds to render each pattern for")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=200000, help="The number of times each operation is done for micro benchmarks")
+    parser.add_argument("--save", type=Path, help="The JSON file to save the results to")
+    parser.add_argument("--compare", type=Path, help="A JSON file saved with --save to compare the results to")
+    args = parser.parse_args()
+
+    if args.suite == "colors":
+        results = benchmark_colors(args.iterations)
+    elif args.suite == "parse":
+        results = benchmark_parse(max(1, args.iterations // 1000))
+    elif args.suite == "parallel":
+        results = benchmark_parallel(args.patterns, args.pixels, args.workers, args.min_seconds, args.max_frames)
+    elif args.suite == "memory":
+        results = benchmark_memory(args.patterns, args.pixels, min(args.max_frames, 60))
+    else:
+        results = benchmark_patterns(args.patterns, args.pixels, args.min_seconds, args.max_frames)
+    if args.save is not None:
+        with args.save.open("w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), args.suite: results}, file, indent=2)
+    if args.compare is not None and args.suite == "patterns":
+        with args.compare.open() as file:
+            baseline = json.load(file)
+        if compare(results, baseline["patterns"]):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
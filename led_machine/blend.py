@@ -1,7 +1,10 @@
 from typing import Optional, Sequence, Tuple
 
+import numpy as np
+
 from led_machine.alter import Alter, Position, LedMetadata
 from led_machine.color import Color, ColorConstants
+from led_machine.frame import FrameBuffer
 from led_machine.percent import PercentGetter
 
 
@@ -10,6 +13,8 @@ class AlterBlend(Alter):
     def __init__(self, percent_getter: PercentGetter, alters: Sequence[Alter]):
         self.percent_getter: PercentGetter = percent_getter
         self.alters = alters
+        self.left_buffer: Optional[FrameBuffer] = None
+        self.right_buffer: Optional[FrameBuffer] = None
 
     def _get_alter(self, percent: float) -> Tuple[Alter, Alter, float]:
         # a value of 0.0 should give exactly self.colors[0]
@@ -28,3 +33,48 @@ class AlterBlend(Alter):
         left_color = left_alter.alter_pixel(seconds, pixel_position, current_color, metadata) or current_color or ColorConstants.BLACK
         right_color = right_alter.alter_pixel(seconds, pixel_position, current_color, metadata) or current_color or ColorConstants.BLACK
         return left_color.lerp(right_color, lerp_percent)
+
+    @staticmethod
+    def _render_alter(alter: Alter, seconds: float, positions: np.ndarray, buffer: FrameBuffer, child_buffer: Optional[FrameBuffer],
+                      metadata: LedMetadata) -> FrameBuffer:
+        """
+        Renders alter on top of a copy of buffer
+        :param child_buffer: The buffer returned by the last call, which is reused if it is the right size
+        :return: The buffer that alter was rendered to
+        """
+        if child_buffer is None or len(child_buffer) != len(buffer):
+            child_buffer = buffer.copy()
+        else:
+            child_buffer.copy_from(buffer)
+        alter.render(seconds, positions, child_buffer, metadata)
+        return child_buffer
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        percent = self.percent_getter.get_percent(seconds)
+        left_alter, right_alter, lerp_percent = self._get_alter(percent)
+        # When a child has no color, we use the current color. If that is also missing, we use black
+        current_colors = np.where(buffer.valid[:, np.newaxis], buffer.colors, 0.0)
+        self.left_buffer = self._render_alter(left_alter, seconds, positions, buffer, self.left_buffer, metadata)
+        left_colors = np.where(self.left_buffer.valid[:, np.newaxis], self.left_buffer.colors, current_colors)
+        if lerp_percent == 0.0:  # the right alter doesn't affect anything, so don't render it
+            buffer.colors[:] = left_colors
+        else:
+            if right_alter is left_alter:
+                right_colors = left_colors
+            else:
+                self.right_buffer = self._render_alter(right_alter, seconds, positions, buffer, self.right_buffer, metadata)
+                right_colors = np.where(self.right_buffer.valid[:, np.newaxis], self.right_buffer.colors, current_colors)
+            buffer.colors[:] = left_colors * (1 - lerp_percent) + right_colors * lerp_percent
+        buffer.valid[:] = True
+
+    def begin_frame(self, seconds: float) -> None:
+        self.percent_getter.begin_frame(seconds)
+        for alter in self.alters:
+            alter.begin_frame(seconds)
+
+    def end_frame(self) -> None:
+        for alter in self.alters:
+            alter.end_frame()
+
+    def is_static(self) -> bool:
+        return self.percent_getter.is_static() and all(alter.is_static() for alter in self.alters)
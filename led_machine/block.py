@@ -1,7 +1,11 @@
+from bisect import bisect_right
 from typing import Tuple, List, Optional, Sequence
 
+import numpy as np
+
 from led_machine.alter import Alter, Position, LedMetadata
 from led_machine.color import ColorAlias, Color, ColorConstants
+from led_machine.frame import FrameBuffer
 from led_machine.percent import PercentGetter
 
 
@@ -11,15 +15,18 @@ class AlterBlock(Alter):
         self.percent_getter = percent_getter
         self.total_width = sum(width for _, width in block_list)
         self.fade = fade
+        self.block_color_array = np.array([(0.0, 0.0, 0.0) if color is None else (color._r, color._g, color._b) for color, _ in self.block_list])
+        self.block_valid_array = np.array([color is not None for color, _ in self.block_list])
+        self.block_ends: List[int] = list(np.cumsum([width for _, width in self.block_list]))
+        """The position each block ends at (exclusive)"""
+        self.pixel_block_array = np.repeat(np.arange(len(self.block_list)), [width for _, width in self.block_list])
+        """The index of the block at each position from 0 to total_width"""
 
     def _get_color(self, pixel: int) -> Optional[Color]:
-        offset = 0
-        for block in self.block_list:
-            color, width = block
-            if pixel < width + offset:
-                return color
-            offset += width
-        raise AssertionError("This shouldn't happen! pixel must be out of bounds! pixel: {}".format(pixel))
+        index = bisect_right(self.block_ends, pixel)
+        if index >= len(self.block_list):
+            raise AssertionError("This shouldn't happen! pixel must be out of bounds! pixel: {}".format(pixel))
+        return self.block_list[index][0]
 
     def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
         percent = self.percent_getter.get_percent(seconds)
@@ -44,3 +51,34 @@ class AlterBlock(Alter):
                 return high_pixel_color
             return low_pixel_color
         return low_pixel_color.lerp(high_pixel_color, lerp_percent)
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        percent = self.percent_getter.get_percent(seconds)
+        offset = percent * self.total_width
+        pixel_to_get = (positions + offset) % self.total_width
+        low_pixel = pixel_to_get.astype(int)
+        high_pixel = (low_pixel + 1) % self.total_width
+        lerp_percent = pixel_to_get % 1
+
+        low_block = self.pixel_block_array[low_pixel]
+        high_block = self.pixel_block_array[high_pixel]
+        # When a block has no color, we use the current color. If that is also missing, we use black
+        low_has_color = self.block_valid_array[low_block]
+        high_has_color = self.block_valid_array[high_block]
+        current_colors = np.where(buffer.valid[:, np.newaxis], buffer.colors, 0.0)
+        low_pixel_color = np.where(low_has_color[:, np.newaxis], self.block_color_array[low_block], current_colors)
+        high_pixel_color = np.where(high_has_color[:, np.newaxis], self.block_color_array[high_block], current_colors)
+
+        if not self.fade:
+            use_high = lerp_percent > 0.5  # the same as round(lerp_percent) == 1
+            buffer.colors[:] = np.where(use_high[:, np.newaxis], high_pixel_color, low_pixel_color)
+        else:
+            lerp_percent = lerp_percent[:, np.newaxis]
+            buffer.colors[:] = low_pixel_color * (1 - lerp_percent) + high_pixel_color * lerp_percent
+        buffer.valid |= low_has_color | high_has_color
+
+    def begin_frame(self, seconds: float) -> None:
+        self.percent_getter.begin_frame(seconds)
+
+    def is_static(self) -> bool:
+        return self.percent_getter.is_static()
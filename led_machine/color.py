@@ -1,9 +1,11 @@
-from typing import Tuple, TypeVar, Generic, Union
+from typing import Tuple, TypeVar, Generic, Union, Optional
 
 T = TypeVar('T', 'RawColor', 'Color')
 
 
 class RawColor(Generic[T]):
+    __slots__ = ("_r", "_g", "_b")
+
     def __init__(self, r: float, g: float, b: float):
         self._r = float(r)
         self._g = float(g)
@@ -23,7 +25,7 @@ class RawColor(Generic[T]):
         return RawColor(self._r / scalar, self._g / scalar, self._b / scalar)
 
     def clamped(self) -> 'Color':
-        return Color(max(0.0, min(1.0, self._r)), max(0.0, min(1.0, self._g)), max(0.0, min(1.0, self._b)))
+        return Color.create_unchecked(max(0.0, min(1.0, self._r)), max(0.0, min(1.0, self._g)), max(0.0, min(1.0, self._b)))
 
     def color(self) -> 'Color':
         return Color(self._r, self._g, self._b)
@@ -50,6 +52,8 @@ ColorAlias = Union['Color', Tuple[int, int, int]]
 
 
 class Color(RawColor):
+    __slots__ = ("_tuple",)
+
     def __init__(self, r: float, g: float, b: float):
         if r < 0 or r > 1:
             raise ValueError(f"r out of range! r: {r}")
@@ -58,7 +62,27 @@ class Color(RawColor):
         if b < 0 or b > 1:
             raise ValueError(f"b out of range! r: {b}")
         super().__init__(r, g, b)
-        self.tuple = (int(self._r * 255), int(self._g * 255), int(self._b * 255))
+        self._tuple: Optional[Tuple[int, int, int]] = None
+
+    @classmethod
+    def create_unchecked(cls, r: float, g: float, b: float) -> 'Color':
+        """
+        Creates a color without checking that each value is in range [0..1].
+        This should only be used when the values are already known to be in range, such as the result of a lerp between two colors.
+        """
+        color = cls.__new__(cls)
+        color._r = r
+        color._g = g
+        color._b = b
+        color._tuple = None
+        return color
+
+    @property
+    def tuple(self) -> Tuple[int, int, int]:
+        """The red, green, and blue of this color in range [0..255]. This is only calculated when it is first needed."""
+        if self._tuple is None:
+            self._tuple = (int(self._r * 255), int(self._g * 255), int(self._b * 255))
+        return self._tuple
 
     def __len__(self):
         return 3
@@ -71,7 +95,7 @@ class Color(RawColor):
             raise ValueError(f"scalar cannot be negative! scalar: {scalar}")
         if scalar > 1:
             raise ValueError(f"scalar cannot be greater than 1! scalar: {scalar}")
-        return Color(self._r * scalar, self._g * scalar, self._b * scalar)
+        return Color.create_unchecked(self._r * scalar, self._g * scalar, self._b * scalar)
 
     def lerp(self, other: T, percent: float) -> T:
         if isinstance(other, Color):
@@ -79,7 +103,7 @@ class Color(RawColor):
                 raise ValueError(f"percent cannot be negative! percent: {percent}")
             if percent > 1:
                 raise ValueError(f"percent cannot be greater than 1! percent: {percent}")
-            return Color(
+            return Color.create_unchecked(
                 self._r * (1 - percent) + other._r * percent,
                 self._g * (1 - percent) + other._g * percent,
                 self._b * (1 - percent) + other._b * percent
@@ -106,6 +130,6 @@ class Color(RawColor):
 
 
 class ColorConstants:
-    BLACK = Color(0.0, 0.0, 0.0)
-    WHITE = Color(1.0, 1.0, 1.0)
+    BLACK = Color.from_bytes(0, 0, 0)
+    WHITE = Color.from_bytes(255, 255, 255)
 
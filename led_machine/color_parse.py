@@ -1,56 +1,92 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple, Dict
 
 from led_machine.color import Color
 
+HOT_PURPLE = Color(r=1.0, g=0.0, b=0.9642934927623834)
+TIGER = Color(r=1.0, g=0.7072935145244612, b=0.0)
+DEEP_PURPLE = Color.from_bytes(255, 0, 70)
+PURPLE = Color.from_bytes(255, 0, 255)
+CYAN = Color.from_bytes(0, 255, 255)
 
-def parse_colors(text: str) -> List[Color]:
-    text = text.lower()
+NAMED_COLORS: List[Tuple[str, Color]] = [
+    ("brown", Color.from_bytes(165, 42, 23)),
+    ("purple", PURPLE),
+    ("pink", Color.from_bytes(255, 100, 120)),
+    ("red", Color.from_bytes(255, 0, 0)),
+    ("green", Color.from_bytes(0, 255, 0)),
+    ("blue", Color.from_bytes(0, 0, 255)),
+    ("orange", Color.from_bytes(255, 45, 0)),
+    ("tiger", TIGER),
+    ("yellow", Color.from_bytes(255, 170, 0)),
+    ("teal", CYAN),
+    ("cyan", CYAN),
+    ("aqua", Color.from_bytes(0, 255, 70)),
+    ("white", Color.from_bytes(255, 255, 255)),
+    ("dupree", Color.from_24bit(0xFF1100)),
+]
+"""Each name mapped to its color. A word may contain a name, and if it contains more than one, the name that comes first in this list is used."""
+
+PURPLE_MODIFIERS: List[Tuple[str, Color]] = [
+    ("deep", DEEP_PURPLE),
+    ("hot", HOT_PURPLE),
+]
+"""Words that change the color of purple when they are in the same word or the word before it, such as "deep purple" """
+
+EXACT_NAMED_COLORS: Dict[str, Color] = {name: color for name, color in NAMED_COLORS if name != "purple"}
+"""Words that can be looked up directly without checking every name. Purple is not here because its color depends on the word before it."""
+
+
+def _parse_hex(word: str) -> Optional[Color]:
+    """
+    :param word: A word without the leading #
+    """
+    if len(word) == 3:
+        word = "".join(a * 2 for a in word)
+    if len(word) == 6:
+        try:
+            return Color.from_bytes(*bytes.fromhex(word))
+        except ValueError:
+            print(f"Couldn't parse: {repr(word)}")
+    else:
+        print(f"Cannot parse word: {repr(word)}")
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_word(word: str, previous_word: Optional[str]) -> Optional[Color]:
+    if word.startswith("#"):
+        return _parse_hex(word[1:])
+    for name, color in NAMED_COLORS:
+        if name in word:
+            if color is PURPLE:
+                for modifier, modified_color in PURPLE_MODIFIERS:
+                    if modifier in word or (previous_word is not None and modifier in previous_word):
+                        return modified_color
+            return color
+    return None
+
+
+@lru_cache(maxsize=64)
+def _parse_colors(text: str) -> Tuple[Color, ...]:
     result: List[Color] = []
-    word_list = text.split()
-    for i, word in enumerate(word_list):
-        previous_word = None if i == 0 else word_list[i - 1]
-        if word.startswith("#"):
-            word = word[1:]
-            if len(word) == 3:
-                word = "".join(a * 2 for a in word)
-            if len(word) == 6:
-                try:
-                    value = int(word[0:6], 16)
-                    result.append(Color.from_24bit(value))
-                except ValueError:
-                    print(f"Couldn't parse: {repr(word)}")
-            else:
-                print(f"Cannot parse word: {repr(word)}")
-        elif "brown" in word:
-            result.append(Color.from_bytes(165, 42, 23))
-        elif "purple" in word and ("deep" in word or (previous_word is not None and "deep" in previous_word)):
-            result.append(Color.from_bytes(255, 0, 70))
-        elif "purple" in word and ("hot" in word or (previous_word is not None and "hot" in previous_word)):
-            result.append(Color(r=1.0, g=0.0, b=0.9642934927623834))
-        elif "purple" in word:
-            result.append(Color.from_bytes(255, 0, 255))
-        elif "pink" in word:
-            result.append(Color.from_bytes(255, 100, 120))
-        elif "red" in word:
-            result.append(Color.from_bytes(255, 0, 0))
-        elif "green" in word:
-            result.append(Color.from_bytes(0, 255, 0))
-        elif "blue" in word:
-            result.append(Color.from_bytes(0, 0, 255))
-        elif "orange" in word:
-            result.append(Color.from_bytes(255, 45, 0))
-        elif "tiger" in word:
-            result.append(Color(r=1.0, g=0.7072935145244612, b=0.0))
-        elif "yellow" in word:
-            result.append(Color.from_bytes(255, 170, 0))
-        elif "teal" in word or "cyan" in word:
-            result.append(Color.from_bytes(0, 255, 255))
-        elif "aqua" in word:
-            result.append(Color.from_bytes(0, 255, 70))
-        elif "white" in word:
-            result.append(Color.from_bytes(255, 255, 255))
-        elif "dupree" in word:
-            result.append(Color.from_24bit(0xFF1100))
-
-    return result
+    word_list = text.lower().split()
+    previous_word: Optional[str] = None
+    for word in word_list:
+        color = EXACT_NAMED_COLORS.get(word)
+        if color is None:
+            # Only purple cares about the previous word, so there's no need to give it to _parse_word (which would make caching less effective)
+            color = _parse_word(word, previous_word if "purple" in word else None)
+        if color is not None:
+            result.append(color)
+        previous_word = word
 
+    return tuple(result)
+
+
+def parse_colors(text: str) -> List[Color]:
+    """
+    Results are cached, so parsing the same text again (such as a long storm message) is fast.
+    :return: A list of each color in the text
+    """
+    return list(_parse_colors(text))
@@ -1,9 +1,33 @@
 from typing import List, Optional, Sequence
 
+import numpy as np
+
 from led_machine.alter import Alter, Position, LedMetadata
 from led_machine.color import ColorAlias, Color
+from led_machine.frame import FrameBuffer
 from led_machine.percent import PercentGetter
 
+PALETTE_STEPS_PER_COLOR = 128
+"""The number of palette entries between two colors. This is enough for every color to be within 1/255 of the exact fade."""
+MAX_PALETTE_SIZE = 2 ** 14
+"""
+The maximum number of entries in a palette (192 KiB), so fades with up to 128 colors use a palette.
+Fades with more colors (storm1 has over 1600) lerp between their colors for each pixel instead, which is a little slower,
+but doesn't need megabytes of memory every time one is created.
+"""
+
+
+def create_fade_palette(colors: Sequence[Color]) -> np.ndarray:
+    """
+    :return: An array with shape (size, 3) where row i is the color of the fade at percent i / size
+    """
+    color_array = np.array([(color._r, color._g, color._b) for color in colors])
+    offsets = np.arange(len(colors) * PALETTE_STEPS_PER_COLOR) / PALETTE_STEPS_PER_COLOR
+    left_index = offsets.astype(int)
+    right_index = (left_index + 1) % len(colors)
+    lerp_percent = (offsets % 1.0)[:, np.newaxis]
+    return (color_array[left_index] * (1 - lerp_percent) + color_array[right_index] * lerp_percent).astype(np.float32)
+
 
 class AlterFade(Alter):
 
@@ -11,6 +35,14 @@ class AlterFade(Alter):
         self.percent_getter: PercentGetter = percent_getter
         self.colors: List[Color] = [Color.from_alias(color) for color in colors]
         self.led_spread = led_spread
+        self.color_array = np.array([(color._r, color._g, color._b) for color in self.colors], dtype=np.float32)
+        self.palette: Optional[np.ndarray] = None
+        if len(self.colors) * PALETTE_STEPS_PER_COLOR <= MAX_PALETTE_SIZE:
+            self.palette = create_fade_palette(self.colors)
+        self.phase_size = len(self.palette) if self.palette is not None else len(self.colors)
+        """The number of entries in the palette, or the number of colors if there is no palette"""
+        self.phase_positions: Optional[np.ndarray] = None
+        self.palette_phases: Optional[np.ndarray] = None
 
     def _get_color(self, percent: float) -> Color:
         # a value of 0.0 should give exactly self.colors[0]
@@ -23,3 +55,31 @@ class AlterFade(Alter):
     def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
         percent = self.percent_getter.get_percent(seconds)
         return self._get_color((percent + pixel_position / self.led_spread) % 1)
+
+    def _get_palette_phases(self, positions: np.ndarray) -> np.ndarray:
+        """
+        :return: The offset of each position into the palette (or colors) when percent is 0. This only changes when positions is a different array.
+        """
+        if positions is not self.phase_positions or self.palette_phases is None:
+            self.palette_phases = (positions / self.led_spread % 1) * self.phase_size
+            self.phase_positions = positions
+        return self.palette_phases
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        percent = self.percent_getter.get_percent(seconds)
+        if self.palette is not None:
+            indices = np.rint(self._get_palette_phases(positions) + percent * self.phase_size).astype(int) % self.phase_size
+            buffer.colors[:] = self.palette[indices]
+        else:
+            offsets = (self._get_palette_phases(positions) + percent * self.phase_size) % self.phase_size
+            left_index = np.minimum(offsets.astype(int), self.phase_size - 1)
+            right_index = (left_index + 1) % self.phase_size
+            lerp_percent = (offsets - left_index)[:, np.newaxis]
+            buffer.colors[:] = self.color_array[left_index] * (1 - lerp_percent) + self.color_array[right_index] * lerp_percent
+        buffer.valid[:] = True
+
+    def begin_frame(self, seconds: float) -> None:
+        self.percent_getter.begin_frame(seconds)
+
+    def is_static(self) -> bool:
+        return self.percent_getter.is_static()
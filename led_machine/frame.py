@@ -0,0 +1,78 @@
+from typing import Optional, List, Tuple
+
+import numpy as np
+
+from led_machine.color import Color
+
+
+class FrameBuffer:
+    """
+    Stores the color of many pixels in contiguous arrays so that alters can alter an entire frame in place
+    without creating a :class:`Color` for each pixel.
+    """
+    def __init__(self, size: int):
+        self.colors: np.ndarray = np.zeros((size, 3), dtype=np.float32)
+        """An array with shape (size, 3) where each row is the red, green, and blue of a pixel in range [0..1]"""
+        self.valid: np.ndarray = np.zeros(size, dtype=bool)
+        """An array where each element is False if that pixel has no color (None). When False, the row in colors should be ignored."""
+
+    @classmethod
+    def from_arrays(cls, colors: np.ndarray, valid: np.ndarray) -> 'FrameBuffer':
+        buffer = cls(0)
+        buffer.colors = colors
+        buffer.valid = valid
+        return buffer
+
+    def __len__(self):
+        return len(self.valid)
+
+    def clear(self):
+        """
+        Makes every pixel have no color
+        """
+        self.valid[:] = False
+
+    def fill(self, color: Color):
+        self.colors[:] = (color._r, color._g, color._b)
+        self.valid[:] = True
+
+    def get_color(self, index: int) -> Optional[Color]:
+        if not self.valid[index]:
+            return None
+        r, g, b = self.colors[index].tolist()
+        return Color.create_unchecked(r, g, b)
+
+    def set_color(self, index: int, color: Optional[Color]):
+        if color is None:
+            self.valid[index] = False
+        else:
+            self.colors[index] = (color._r, color._g, color._b)
+            self.valid[index] = True
+
+    def view(self, start: int, end: int) -> 'FrameBuffer':
+        """
+        :return: A buffer that shares the pixels from start to end (exclusive) with this buffer, so changes to it also change this buffer
+        """
+        return self.__class__.from_arrays(self.colors[start:end], self.valid[start:end])
+
+    def copy(self) -> 'FrameBuffer':
+        return self.__class__.from_arrays(self.colors.copy(), self.valid.copy())
+
+    def copy_from(self, buffer: 'FrameBuffer'):
+        """
+        Copies every pixel of the given buffer, which must be the same length as this buffer
+        """
+        self.colors[:] = buffer.colors
+        self.valid[:] = buffer.valid
+
+    def to_bytes(self) -> np.ndarray:
+        """
+        :return: An array of uint8 with shape (len(self), 3). Pixels that have no color are black.
+        """
+        # The small offset keeps float32 rounding error from truncating a value like 200/255 to 199
+        result = (np.clip(self.colors, 0.0, 1.0) * 255 + 1e-3).astype(np.uint8)
+        result[~self.valid] = 0
+        return result
+
+    def to_tuples(self) -> List[Tuple[int, int, int]]:
+        return [tuple(row) for row in self.to_bytes().tolist()]
@@ -9,7 +9,7 @@ from led_machine.northern_lights import AlterNorthernLights
 from led_machine.parse import parse_to_tokens, COMMENT_PARSE_PAIR, SINGLE_LINE_COMMENT_PARSE_PAIR, PARENTHESIS_PARSE_PAIR
 from led_machine.parsing import get_number_before, get_string_after, tokens_to_creator, PARTITION_TOKEN, BLEND_TOKEN, CreatorSettings, AlterCreator
 from led_machine.percent import ReversingPercentGetter, BouncePercentGetter, MultiplierPercentGetter, \
-    PercentGetterTimeMultiplier
+    PercentGetterTimeMultiplier, FrameCachedPercentGetter
 from led_machine.rainbow import AlterRainbow
 from led_machine.stars import AlterStar
 from led_machine.twinkle import AlterTwinkle
@@ -125,9 +125,10 @@ def get_time_multiplier(text: str) -> Optional[float]:
 
 
 class LedConstants:
-    default_percent_getter = ReversingPercentGetter(2.0, 10.0 * 60, 2.0)
-    quick_bounce_percent_getter = BouncePercentGetter(12.0)
-    slow_default_percent_getter = ReversingPercentGetter(4.0, 10.0 * 60, 4.0)
+    # These are shared between many alters, so they are cached to only be evaluated once per frame
+    default_percent_getter = FrameCachedPercentGetter(ReversingPercentGetter(2.0, 10.0 * 60, 2.0))
+    quick_bounce_percent_getter = FrameCachedPercentGetter(BouncePercentGetter(12.0))
+    slow_default_percent_getter = FrameCachedPercentGetter(ReversingPercentGetter(4.0, 10.0 * 60, 4.0))
     # josh_lamp_partition_list = [(START_PIXELS_TO_HIDE, 17), (NUMBER_OF_PIXELS - 19, 19)]
 
 
@@ -148,7 +149,7 @@ class LedState:
         self.color_percent_getter = LedConstants.default_percent_getter  # when we had volume stuff, we used to use the above line
         """The percent getter that should be used for all color settings except for solid"""
         # self.solid_color_percent_getter = SumPercentGetter([ReversingPercentGetter(10.0, 15.0 * 60, 10.0), color_percent_getter_push])
-        self.solid_color_percent_getter = ReversingPercentGetter(10.0, 15.0 * 60, 10.0)
+        self.solid_color_percent_getter = FrameCachedPercentGetter(ReversingPercentGetter(10.0, 15.0 * 60, 10.0))
         """The percent getter that should be used for solid color settings"""
 
         simple_rainbow = self.parse_color_setting("rainbow", lambda: self.color_time_multiplier)
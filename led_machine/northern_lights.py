@@ -1,15 +1,20 @@
 import math
-import random
 from typing import List, Optional
 
+import numpy as np
+
 from led_machine.alter import Alter, Position, LedMetadata
 from led_machine.color import Color
+from led_machine.frame import FrameBuffer
+from led_machine.randomness import get_random
 
 OFFSET_TRANSLATE_SPEED = 3.0
 """Offset translate speed in pixels per second"""
 
 
 class Chunk:
+    __slots__ = ("color", "width", "fade_spot", "fade_oscillate_speed", "fade_oscillate_magnitude")
+
     def __init__(self, color: Color):
         self.color = color
         self.width = 0.0
@@ -32,14 +37,22 @@ class AlterNorthernLights(Alter):
         # normally we'd set last_xxx to None, but setting to 0 makes it just work out nicely
         self.last_seconds = 0.0
         self.last_random = 0.0
+        self.random = get_random()
+
+        self.chunk_color_array = np.array([(chunk.color._r, chunk.color._g, chunk.color._b) for chunk in self.chunks])
+        self.full_chunk_width = self.pixel_span / len(self.chunks)
+        self.chunk_starts = np.arange(len(self.chunks)) * self.full_chunk_width
+        self.chunk_ends = np.arange(1, len(self.chunks) + 1) * self.full_chunk_width
+        # These are updated once per frame
+        self.chunk_widths = np.zeros(len(self.chunks))
+        self.focal_points = np.zeros(len(self.chunks))
 
         self.reset()
 
     def reset(self):
-        full_chunk_width = self.pixel_span / len(self.chunks)
         for chunk in self.chunks:
             chunk.fade_spot = 0.5
-            chunk.width = full_chunk_width / 3
+            chunk.width = self.full_chunk_width / 3
 
     def set_desired_offset(self, desired_offset: float):
         result = (desired_offset - self.offset) % self.pixel_span
@@ -47,7 +60,7 @@ class AlterNorthernLights(Alter):
             result -= self.pixel_span
         self.desired_offset = self.offset + result
 
-    def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
+    def begin_frame(self, seconds: float) -> None:
         delta = seconds - self.last_seconds  # delta may be 0 sometimes, and that is OK
         self.last_seconds = seconds
         if delta > 1.0:
@@ -59,32 +72,43 @@ class AlterNorthernLights(Alter):
 
         if seconds - self.last_random >= 5:
             self.last_random = seconds
-            choice = random.randint(0, 1)
+            choice = self.random.integers(0, 1, endpoint=True)
             if choice == 0:
-                self.set_desired_offset(random.randint(0, self.pixel_span))
+                self.set_desired_offset(int(self.random.integers(0, self.pixel_span, endpoint=True)))
             elif choice == 1:
-                chunk = random.choice(self.chunks)
-                chunk.fade_spot = random.uniform(0.3, 0.7)
-                chunk.fade_oscillate_speed = random.uniform(0.9, 1.1)
-                chunk.fade_oscillate_magnitude = random.uniform(0.05, 0.2)
-
-        full_chunk_width = self.pixel_span / len(self.chunks)
-        pixel_spot = (pixel_position + self.offset) % self.pixel_span
-        for chunk_index, chunk in enumerate(self.chunks):
-            if pixel_spot <= chunk_index * full_chunk_width + chunk.width:
-                return chunk.color
-            if pixel_spot < (chunk_index + 1) * full_chunk_width:
-                left_color = chunk.color
-                right_color = self.chunks[(chunk_index + 1) % len(self.chunks)].color
-                middle_color = left_color.lerp(right_color, 0.5)
-                fade_divisor = full_chunk_width - chunk.width
-                percent_distance = (pixel_spot - chunk_index * full_chunk_width - chunk.width) / fade_divisor
-                focal_point = chunk.get_focal_point(seconds)
-                assert 0 <= focal_point <= 1, f"Focal point is {focal_point}"
-                if percent_distance <= focal_point:
-                    return left_color.lerp(middle_color, percent_distance / focal_point)
-                else:
-                    percent_lerp = (percent_distance - focal_point) / (1 - focal_point)
-                    return middle_color.lerp(right_color, percent_lerp)
-
-        raise AssertionError(f"Could not find chunk for position: {pixel_position}")
+                chunk = self.chunks[self.random.integers(len(self.chunks))]
+                chunk.fade_spot, chunk.fade_oscillate_speed, chunk.fade_oscillate_magnitude = self.random.uniform((0.3, 0.9, 0.05), (0.7, 1.1, 0.2))
+
+        self.chunk_widths = np.array([chunk.width for chunk in self.chunks])
+        self.focal_points = np.array([chunk.get_focal_point(seconds) for chunk in self.chunks])
+        assert np.all((0 <= self.focal_points) & (self.focal_points <= 1)), f"Focal points are {self.focal_points}"
+
+    def _get_colors(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Each chunk is a solid color followed by a fade to the middle color at the focal point, then a fade to the next chunk's color.
+        :return: An array with shape (len(positions), 3) of the color at each position
+        """
+        pixel_spot = (positions + self.offset) % self.pixel_span
+        chunk_index = np.minimum(np.searchsorted(self.chunk_ends, pixel_spot, side="right"), len(self.chunks) - 1)
+        chunk_start = self.chunk_starts[chunk_index]
+        chunk_width = self.chunk_widths[chunk_index]
+        focal_point = self.focal_points[chunk_index]
+        left_color = self.chunk_color_array[chunk_index]
+        right_color = self.chunk_color_array[(chunk_index + 1) % len(self.chunks)]
+        middle_color = left_color * 0.5 + right_color * 0.5
+
+        percent_distance = (pixel_spot - chunk_start - chunk_width) / (self.full_chunk_width - chunk_width)
+        before_focal_point = percent_distance <= focal_point
+        percent_lerp = np.where(before_focal_point, percent_distance / focal_point, (percent_distance - focal_point) / (1 - focal_point))[:, np.newaxis]
+        from_color = np.where(before_focal_point[:, np.newaxis], left_color, middle_color)
+        to_color = np.where(before_focal_point[:, np.newaxis], middle_color, right_color)
+        is_solid = (pixel_spot <= chunk_start + chunk_width)[:, np.newaxis]
+        return np.where(is_solid, left_color, from_color * (1 - percent_lerp) + to_color * percent_lerp)
+
+    def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
+        red, green, blue = self._get_colors(np.array([pixel_position]))[0]
+        return Color.create_unchecked(float(red), float(green), float(blue))
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        buffer.colors[:] = self._get_colors(positions)
+        buffer.valid[:] = True
@@ -0,0 +1,95 @@
+from typing import Optional
+
+import numpy as np
+
+from led_machine.frame import FrameBuffer
+
+BRIGHTNESS_TABLE_RESOLUTION = 4096
+"""The number of entries in a brightness table"""
+
+
+class BrightnessTable:
+    """
+    Maps a color value in range [0..1] to a device level in range [0..255] after brightness and gamma are applied
+    """
+    def __init__(self, brightness: float, gamma: float = 1.0, resolution: int = BRIGHTNESS_TABLE_RESOLUTION):
+        if brightness < 0:
+            raise ValueError(f"brightness cannot be negative! brightness: {brightness}")
+        if brightness > 1:
+            raise ValueError(f"brightness cannot be greater than 1! brightness: {brightness}")
+        self.brightness = brightness
+        self.gamma = gamma
+        self.levels: np.ndarray = (np.linspace(0.0, 1.0, resolution) ** gamma * brightness * 255).astype(np.float32)
+        """The device level for each entry. These are not rounded, so that the fractional part can be dithered."""
+
+    def lookup(self, colors: np.ndarray) -> np.ndarray:
+        """
+        :param colors: An array of values in range [0..1]
+        :return: An array with the same shape containing the (unrounded) device level of each value
+        """
+        resolution = len(self.levels)
+        indices = np.rint(np.clip(colors, 0.0, 1.0) * (resolution - 1)).astype(np.intp)
+        return self.levels[indices]
+
+
+class PixelOutput:
+    """
+    Writes frames to a NeoPixel (or anything that acts like one). A frame is not written when it is the same as the last frame that was written.
+
+    Brightness and gamma are applied here with a :class:`BrightnessTable` rather than by scaling each color.
+    When dithering is enabled, the part of each level that can't be shown is carried over to the next frame,
+    so a level of 0.3 is shown as 1 on about 30% of frames instead of always being 0.
+    """
+    def __init__(self, pixels, brightness: float = 1.0, gamma: float = 1.0, dither: bool = False):
+        self.pixels = pixels
+        self.table = BrightnessTable(brightness, gamma)
+        self.dither = dither
+        self.dither_error: Optional[np.ndarray] = None
+        self.last_frame: Optional[np.ndarray] = None
+        self.write_count = 0
+        self.skipped_write_count = 0
+
+    @property
+    def brightness(self) -> float:
+        return self.table.brightness
+
+    @brightness.setter
+    def brightness(self, brightness: float):
+        if brightness != self.table.brightness:  # Only rebuild the table when we need to
+            self.table = BrightnessTable(brightness, self.table.gamma)
+
+    def to_bytes(self, buffer: FrameBuffer) -> np.ndarray:
+        """
+        :return: An array of uint8 with shape (len(buffer), 3) containing the levels that should be sent to the pixels
+        """
+        levels = self.table.lookup(buffer.colors)
+        if self.dither:
+            if self.dither_error is None or self.dither_error.shape != levels.shape:
+                self.dither_error = np.zeros_like(levels)
+            levels += self.dither_error
+            result = np.rint(levels)
+            self.dither_error = levels - result
+            self.dither_error[~buffer.valid] = 0.0
+        else:
+            result = np.rint(levels)
+        result = np.clip(result, 0, 255).astype(np.uint8)
+        result[~buffer.valid] = 0
+        return result
+
+    def write(self, buffer: FrameBuffer) -> bool:
+        """
+        Writes the buffer to the pixels and calls show() if it is different from the last frame written
+        :return: True if the frame was written, False if it was skipped
+        """
+        frame = self.to_bytes(buffer)
+        if self.last_frame is not None and np.array_equal(frame, self.last_frame):
+            self.skipped_write_count += 1
+            return False
+        self.pixels[:] = [tuple(row) for row in frame.tolist()]
+        self.pixels.show()
+        self.last_frame = frame
+        self.write_count += 1
+        return True
+
+    def __str__(self):
+        return f"PixelOutput(write_count={self.write_count}, skipped_write_count={self.skipped_write_count})"
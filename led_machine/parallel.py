@@ -0,0 +1,137 @@
+"""
+Renders frames using several processes, so that more than one core can be used.
+
+Each worker has its own copy of every :class:`LedState`. Every message is sent to every worker along with a seed,
+so that patterns that use randomness are created the same way in every worker. Each worker then renders its own range of pixels
+into a frame buffer that is in shared memory, so the only thing sent each frame is the number of seconds and a reply when it is done.
+"""
+import multiprocessing
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from led_machine.alter import Alter, LedMetadata
+from led_machine.frame import FrameBuffer
+from led_machine.handler import LedState, handle_message, MessageContext
+from led_machine.plan import compile_alter, RenderPlan
+from led_machine.randomness import seed_random
+
+LedStatesCreator = Callable[[], Dict[str, LedState]]
+"""Creates the LedStates that messages are given to, by name. This must be a module level function (or a partial of one) so that it can be sent to workers."""
+SettingCreator = Callable[[Dict[str, LedState]], Alter]
+"""Creates the alter to render from the LedStates. This must be a module level function (or a partial of one) so that it can be sent to workers."""
+
+FRAME_COMMAND = "frame"
+MESSAGE_COMMAND = "message"
+STOP_COMMAND = "stop"
+
+
+def _create_shared_buffer(shared_memory: SharedMemory, number_of_pixels: int) -> FrameBuffer:
+    colors = np.ndarray((number_of_pixels, 3), dtype=np.float32, buffer=shared_memory.buf)
+    valid = np.ndarray((number_of_pixels,), dtype=bool, buffer=shared_memory.buf, offset=colors.nbytes)
+    return FrameBuffer.from_arrays(colors, valid)
+
+
+def _run_worker(connection: Connection, shared_memory_name: str, number_of_pixels: int, start: int, end: int, hidden_mask: Optional[np.ndarray],
+                create_led_states: LedStatesCreator, create_setting: SettingCreator, seed: int):
+    shared_memory = SharedMemory(name=shared_memory_name)
+    buffer = _create_shared_buffer(shared_memory, number_of_pixels).view(start, end)
+    positions = np.arange(start, end)
+    seed_random(seed)
+    led_states = create_led_states()
+    plan: Optional[RenderPlan] = None
+    metadata = LedMetadata()
+    while True:
+        command = connection.recv()
+        if command[0] == FRAME_COMMAND:
+            seconds = command[1]
+            if plan is None:
+                plan = RenderPlan(compile_alter(create_setting(led_states)), hidden_mask)
+            plan.alter.begin_frame(seconds)
+            buffer.clear()
+            plan.render(seconds, positions, buffer, metadata)
+            plan.alter.end_frame()
+            connection.send(None)
+        elif command[0] == MESSAGE_COMMAND:
+            _, name, text, is_lamp, message_seed = command
+            seed_random(message_seed)
+            context = MessageContext()
+            handle_message(text, led_states[name], is_lamp, context)
+            plan = None  # The state may have changed
+            connection.send(context)
+        elif command[0] == STOP_COMMAND:
+            break
+    del buffer  # the shared memory cannot be closed while arrays still use it
+    shared_memory.close()
+
+
+class ParallelRenderer:
+    """
+    Renders a strip of pixels by splitting it into a contiguous range for each worker process.
+    """
+    def __init__(self, number_of_pixels: int, workers: int, create_led_states: LedStatesCreator, create_setting: SettingCreator,
+                 hidden_mask: Optional[np.ndarray] = None, seed: int = 0):
+        """
+        :param hidden_mask: A boolean array of length number_of_pixels. Pixels that are True will be black.
+        :param seed: The seed that messages are given seeds from. Each message gets a different seed.
+        """
+        self.seed = seed
+        self.message_count = 0
+        self.shared_memory = SharedMemory(create=True, size=number_of_pixels * 3 * np.dtype(np.float32).itemsize + number_of_pixels)
+        self.buffer = _create_shared_buffer(self.shared_memory, number_of_pixels)
+        """The buffer that each frame is rendered to. This should not be changed, and should only be read after :meth:`finish_frame`."""
+        self.connections: List[Connection] = []
+        self.processes: List[multiprocessing.Process] = []
+
+        # spawn rather than fork, so that workers don't get a copy of any threads (such as the Slack connection)
+        context = multiprocessing.get_context("spawn")
+        bounds = np.linspace(0, number_of_pixels, workers + 1).astype(int)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=_run_worker,
+                args=(worker_connection, self.shared_memory.name, number_of_pixels, int(start), int(end),
+                      None if hidden_mask is None else hidden_mask[start:end], create_led_states, create_setting, seed),
+                daemon=True
+            )
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def handle_message(self, name: str, text: str, is_lamp: bool) -> MessageContext:
+        """
+        Gives the message to the LedState called name in every worker, and waits for them to handle it
+        :return: The context that the message was handled with
+        """
+        self.message_count += 1
+        for connection in self.connections:
+            connection.send((MESSAGE_COMMAND, name, text, is_lamp, self.seed + self.message_count))
+        contexts = [connection.recv() for connection in self.connections]
+        return contexts[0]  # every worker has the same state, so every context is the same
+
+    def start_frame(self, seconds: float):
+        for connection in self.connections:
+            connection.send((FRAME_COMMAND, seconds))
+
+    def finish_frame(self):
+        """
+        Waits for every worker to finish the frame started by :meth:`start_frame`
+        """
+        for connection in self.connections:
+            connection.recv()
+
+    def render(self, seconds: float) -> FrameBuffer:
+        self.start_frame(seconds)
+        self.finish_frame()
+        return self.buffer
+
+    def close(self):
+        for connection in self.connections:
+            connection.send((STOP_COMMAND,))
+        for process in self.processes:
+            process.join()
+        del self.buffer
+        self.shared_memory.close()
+        self.shared_memory.unlink()
@@ -3,11 +3,15 @@ from typing import List
 
 
 class Token(ABC):
+    __slots__ = ()
+
     def __init__(self):
         pass
 
 
 class StaticToken(Token):
+    __slots__ = ("name", "pattern")
+
     def __init__(self, name: str, pattern: str):
         super().__init__()
         self.name: str = name
@@ -21,11 +25,15 @@ class StaticToken(Token):
 
 
 class NothingToken(Token):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
 
 class StringToken(Token):
+    __slots__ = ("data",)
+
     def __init__(self, data: str):
         super().__init__()
         self.data = data
@@ -41,6 +49,8 @@ class StringToken(Token):
 
 
 class OrganizerToken(Token):
+    __slots__ = ("tokens",)
+
     def __init__(self, tokens: List[Token]):
         super().__init__()
         self.tokens = tokens
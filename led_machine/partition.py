@@ -1,7 +1,11 @@
-from typing import Optional, Tuple, Sequence
+import math
+from typing import Optional, Tuple, Sequence, List, Union
+
+import numpy as np
 
 from led_machine.alter import Alter, Position, LedMetadata
 from led_machine.color import Color
+from led_machine.frame import FrameBuffer
 
 
 class AlterPartition(Alter):
@@ -11,14 +15,66 @@ class AlterPartition(Alter):
         where the first int is the start, and the second is the length of the partition
         """
         self.override_list = override_list
+        all_partitions = [partition for _, partitions in override_list for partition in partitions]
+        self.table_start = min((math.floor(start) for start, _ in all_partitions), default=0)
+        table_end = max((math.ceil(start + length) for start, length in all_partitions), default=0)
+        self.position_child_array = self._get_child_indices(np.arange(self.table_start, max(self.table_start, table_end)))
+        """The index of the setting for each position starting at table_start, or -1 if no setting contains that position"""
+
+        self.children_positions: Optional[np.ndarray] = None
+        self.children: List[Tuple[Alter, Union[slice, np.ndarray], np.ndarray]] = []
+        """Each setting that contains any of children_positions as (setting, the indices it contains, the positions at those indices)"""
+
+    def _get_child_indices(self, positions: np.ndarray) -> np.ndarray:
+        child_indices = np.full(len(positions), -1, dtype=int)
+        # go backwards so that the first setting that contains a position is the one that is used
+        for index in reversed(range(len(self.override_list))):
+            _, partitions = self.override_list[index]
+            for start, length in partitions:
+                child_indices[(start <= positions) & (positions < start + length)] = index
+        return child_indices
+
+    def _get_children(self, positions: np.ndarray) -> List[Tuple[Alter, Union[slice, np.ndarray], np.ndarray]]:
+        if positions is not self.children_positions:
+            child_indices = self._get_child_indices(positions)
+            self.children = []
+            for child_index, (setting, _) in enumerate(self.override_list):
+                indices = np.flatnonzero(child_indices == child_index)
+                if len(indices) == 0:
+                    continue
+                if indices[-1] - indices[0] + 1 == len(indices):  # a single contiguous range can be rendered in place
+                    indices = slice(int(indices[0]), int(indices[-1]) + 1)
+                # The positions are kept so that children that cache by positions keep getting the same array
+                self.children.append((setting, indices, positions[indices]))
+            self.children_positions = positions
+        return self.children
 
     def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
-        override_setting: Optional[Alter] = None
-        for setting, partitions in self.override_list:
-            if any(start <= pixel_position < start + length for start, length in partitions):
-                override_setting = setting
-                break
-
-        if override_setting is not None:
-            return override_setting.alter_pixel(seconds, pixel_position, current_color, metadata)
+        index = math.floor(pixel_position) - self.table_start
+        if 0 <= index < len(self.position_child_array):
+            child_index = self.position_child_array[index]
+            if child_index >= 0:
+                return self.override_list[child_index][0].alter_pixel(seconds, pixel_position, current_color, metadata)
         return current_color
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        for setting, indices, child_positions in self._get_children(positions):
+            if isinstance(indices, slice):
+                setting.render(seconds, child_positions, buffer.view(indices.start, indices.stop), metadata)
+            else:
+                # each setting is rendered once, even when its partitions are not next to each other
+                child_buffer = FrameBuffer.from_arrays(buffer.colors[indices], buffer.valid[indices])
+                setting.render(seconds, child_positions, child_buffer, metadata)
+                buffer.colors[indices] = child_buffer.colors
+                buffer.valid[indices] = child_buffer.valid
+
+    def begin_frame(self, seconds: float) -> None:
+        for setting, _ in self.override_list:
+            setting.begin_frame(seconds)
+
+    def end_frame(self) -> None:
+        for setting, _ in self.override_list:
+            setting.end_frame()
+
+    def is_static(self) -> bool:
+        return all(setting.is_static() for setting, _ in self.override_list)
@@ -2,7 +2,7 @@ import math
 from abc import abstractmethod, ABC
 from typing import List, Callable, Optional
 
-from led_machine.types import TimeMultiplierGetter
+from led_machine.types import TimeMultiplierGetter, STOPPED_TIME_MULTIPLIER
 
 
 class PercentGetter(ABC):
@@ -15,6 +15,20 @@ class PercentGetter(ABC):
         """
         pass
 
+    def is_static(self) -> bool:
+        """
+        :return: True if the returned percent does not depend on seconds
+        """
+        return False
+
+    def begin_frame(self, seconds: float) -> None:
+        """
+        Called once before each frame, before :meth:`get_percent` is called with the same seconds.
+        Percent getters that have state should update it here, so that :meth:`get_percent` only has to read it.
+        Percent getters that wrap other percent getters must pass this on to them.
+        """
+        pass
+
 
 class ReversingPercentGetter(PercentGetter):
     def __init__(self, period: float, direction_period: float, reverse_period: float):
@@ -52,6 +66,9 @@ class ConstantPercentGetter(PercentGetter):
     def get_percent(self, seconds: float) -> float:
         return self.percent
 
+    def is_static(self) -> bool:
+        return True
+
 
 class SumPercentGetter(PercentGetter):
     def __init__(self, percent_getter_list: List[PercentGetter]):
@@ -60,6 +77,13 @@ class SumPercentGetter(PercentGetter):
     def get_percent(self, seconds: float) -> float:
         return sum(percent_getter.get_percent(seconds) for percent_getter in self.percent_getter_list) % 1.0
 
+    def is_static(self) -> bool:
+        return all(percent_getter.is_static() for percent_getter in self.percent_getter_list)
+
+    def begin_frame(self, seconds: float) -> None:
+        for percent_getter in self.percent_getter_list:
+            percent_getter.begin_frame(seconds)
+
 
 class MultiplierPercentGetter(PercentGetter):
     def __init__(self, percent_getter: PercentGetter, multiplier: float):
@@ -69,6 +93,12 @@ class MultiplierPercentGetter(PercentGetter):
     def get_percent(self, seconds: float) -> float:
         return (self.percent_getter.get_percent(seconds) * self.multiplier) % 1.0
 
+    def is_static(self) -> bool:
+        return self.percent_getter.is_static()
+
+    def begin_frame(self, seconds: float) -> None:
+        self.percent_getter.begin_frame(seconds)
+
 
 class PercentGetterHolder(PercentGetter):
     def __init__(self, percent_getter: PercentGetter, time_multiplier: float = 1.0):
@@ -78,14 +108,62 @@ class PercentGetterHolder(PercentGetter):
     def get_percent(self, seconds: float) -> float:
         return self.percent_getter.get_percent(seconds * self.time_multiplier)
 
+    def is_static(self) -> bool:
+        return self.percent_getter.is_static()
+
+    def begin_frame(self, seconds: float) -> None:
+        self.percent_getter.begin_frame(seconds * self.time_multiplier)
+
 
 class PercentGetterTimeMultiplier(PercentGetter):
     def __init__(self, percent_getter: PercentGetter, time_multiplier_getter: TimeMultiplierGetter):
         self.percent_getter: PercentGetter = percent_getter
         self.time_multiplier_getter: Callable = time_multiplier_getter
+        self.last_seconds: Optional[float] = None
+        self.last_percent = 0.0
+
+    def get_percent(self, seconds: float) -> float:
+        if seconds != self.last_seconds:  # begin_frame was not called for this frame
+            self.begin_frame(seconds)
+        return self.last_percent
+
+    def is_static(self) -> bool:
+        return self.time_multiplier_getter() <= STOPPED_TIME_MULTIPLIER or self.percent_getter.is_static()
+
+    def begin_frame(self, seconds: float) -> None:
+        if seconds == self.last_seconds:  # only call time_multiplier_getter once per frame
+            return
+        scaled_seconds = seconds * self.time_multiplier_getter()
+        self.percent_getter.begin_frame(scaled_seconds)
+        self.last_percent = self.percent_getter.get_percent(scaled_seconds)
+        self.last_seconds = seconds
+
+
+class FrameCachedPercentGetter(PercentGetter):
+    """
+    Only evaluates the wrapped percent getter once for a given value of seconds.
+    Every alter is given the same seconds during a frame, so wrapping a percent getter that is shared between alters
+    means that it is only evaluated once per frame, no matter how many alters or pixels use it.
+    """
+    def __init__(self, percent_getter: PercentGetter):
+        self.percent_getter = percent_getter
+        self.last_seconds: Optional[float] = None
+        self.last_percent = 0.0
 
     def get_percent(self, seconds: float) -> float:
-        return self.percent_getter.get_percent(seconds * self.time_multiplier_getter())
+        if seconds != self.last_seconds:  # begin_frame was not called for this frame
+            self.begin_frame(seconds)
+        return self.last_percent
+
+    def is_static(self) -> bool:
+        return self.percent_getter.is_static()
+
+    def begin_frame(self, seconds: float) -> None:
+        if seconds == self.last_seconds:  # this is shared, so it may be given the same frame more than once
+            return
+        self.percent_getter.begin_frame(seconds)
+        self.last_percent = self.percent_getter.get_percent(seconds)
+        self.last_seconds = seconds
 
 
 class BouncePercentGetter(PercentGetter):
@@ -102,6 +180,8 @@ class BouncePercentGetter(PercentGetter):
 class SmoothPercentGetter(PercentGetter):
     """
     Smooths a percentage from 0 to 1, but does not (yet) do any continuous smoothing. (0 and 1 are not the same)
+
+    The percent moves once per frame, in :meth:`begin_frame` or in :meth:`get_percent` if begin_frame was not called for that frame.
     """
     PERCENT_MOVE_PER_SECOND = 5.0
 
@@ -110,7 +190,10 @@ class SmoothPercentGetter(PercentGetter):
         self.current_percent = 0.0
         self.last_time: Optional[float] = None
 
-    def get_percent(self, seconds: float) -> float:
+    def begin_frame(self, seconds: float) -> None:
+        self.percent_getter.begin_frame(seconds)
+        if seconds == self.last_time:
+            return
         delta = seconds - self.last_time if self.last_time is not None else 0.01  # hard code a default delta
         self.last_time = seconds
         max_move = delta * self.__class__.PERCENT_MOVE_PER_SECOND
@@ -125,4 +208,8 @@ class SmoothPercentGetter(PercentGetter):
         elif direction < 0 and new_percent < desired_percent:
             new_percent = desired_percent
         self.current_percent = new_percent
-        return new_percent
+
+    def get_percent(self, seconds: float) -> float:
+        if seconds != self.last_time:
+            self.begin_frame(seconds)
+        return self.current_percent
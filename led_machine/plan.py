@@ -0,0 +1,96 @@
+from typing import List, Optional, Sequence, Callable
+
+import numpy as np
+
+from led_machine.alter import Alter, AlterMultiplexer, AlterNothing, AlterSolid, AlterDim, AlterSpeedOfAlter, LedMetadata
+from led_machine.blend import AlterBlend
+from led_machine.frame import FrameBuffer
+from led_machine.partition import AlterPartition
+
+
+def map_children(alter: Alter, function: Callable[[Alter], Alter]) -> Alter:
+    """
+    :return: A copy of the given alter where each alter it is composed of is replaced with function(child),
+    or the given alter if it is not composed of other alters
+    """
+    if isinstance(alter, AlterMultiplexer):
+        return AlterMultiplexer([function(child) for child in alter.alters])
+    if isinstance(alter, AlterPartition):
+        return AlterPartition([(function(setting), partitions) for setting, partitions in alter.override_list])
+    if isinstance(alter, AlterSpeedOfAlter):
+        return AlterSpeedOfAlter(function(alter.alter), alter.time_multiplier_getter)
+    if isinstance(alter, AlterBlend):
+        return AlterBlend(alter.percent_getter, [function(child) for child in alter.alters])
+    return alter
+
+
+def compile_alter(alter: Alter) -> Alter:
+    """
+    Creates an alter that renders the same thing as the given alter, but does less work.
+    Alters that are not composed of other alters are reused rather than copied, so stateful alters keep their state.
+
+    Note that the values of any :class:`AlterDim` are copied, so the alter should be compiled again if the dim changes.
+    """
+    if isinstance(alter, AlterMultiplexer):
+        stages = _compile_stages(alter.alters)
+        if not stages:
+            return AlterNothing()
+        if len(stages) == 1:
+            return stages[0]
+        return AlterMultiplexer(stages)
+    alter = map_children(alter, compile_alter)
+    # We can't remove a single partition that does nothing because that would let the next partition that contains the same pixels take over
+    if isinstance(alter, AlterPartition) and all(isinstance(setting, AlterNothing) for setting, _ in alter.override_list):
+        return AlterNothing()
+    return alter
+
+
+def _compile_stages(alters: Sequence[Alter]) -> List[Alter]:
+    stages: List[Alter] = []
+    for alter in alters:
+        alter = compile_alter(alter)
+        nested_stages = alter.alters if isinstance(alter, AlterMultiplexer) else [alter]
+        for stage in nested_stages:
+            previous = stages[-1] if stages else None
+            if isinstance(stage, AlterNothing):
+                continue
+            if isinstance(stage, AlterSolid):
+                stages = [stage]  # a solid color doesn't care about the current color, so everything before it is useless
+            elif isinstance(stage, AlterDim) and stage.dim == 1.0:
+                continue
+            elif isinstance(stage, AlterDim) and isinstance(previous, AlterSolid):
+                stages[-1] = AlterSolid(previous.color.scale(stage.dim))
+            elif isinstance(stage, AlterDim) and isinstance(previous, AlterDim):
+                stages[-1] = AlterDim(previous.dim * stage.dim)
+            else:
+                stages.append(stage)
+    return stages
+
+
+class RenderPlan:
+    """
+    A compiled alter along with a precomputed mask of pixels that should always be black.
+    If the alter is static when the plan is created, it is only rendered once, and that frame is reused by every call to :meth:`render`.
+    """
+    def __init__(self, alter: Alter, hidden_mask: Optional[np.ndarray] = None):
+        """
+        :param alter: The alter to render. This should usually be the result of :func:`compile_alter`
+        :param hidden_mask: A boolean array the same length as the positions that will be rendered. Pixels that are True will be black.
+        """
+        self.alter = alter
+        self.hidden_mask = hidden_mask if hidden_mask is not None and hidden_mask.any() else None
+        self.static = alter.is_static()
+        self.static_positions: Optional[np.ndarray] = None
+        self.static_buffer: Optional[FrameBuffer] = None
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        if self.static_buffer is not None and positions is self.static_positions:
+            buffer.copy_from(self.static_buffer)
+            return
+        self.alter.render(seconds, positions, buffer, metadata)
+        if self.hidden_mask is not None:
+            buffer.colors[self.hidden_mask] = 0.0
+            buffer.valid[self.hidden_mask] = True
+        if self.static:
+            self.static_positions = positions
+            self.static_buffer = buffer.copy()
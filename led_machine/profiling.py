@@ -0,0 +1,104 @@
+import time
+from collections import deque
+from typing import Optional, List, Deque
+
+import numpy as np
+
+from led_machine.alter import Alter, Position, LedMetadata
+from led_machine.color import Color
+from led_machine.frame import FrameBuffer
+from led_machine.plan import map_children
+
+FRAME_WINDOW = 300
+"""The number of frames that percentiles are calculated from"""
+
+
+class AlterProfile:
+    """
+    Records the number of nanoseconds spent in a single alter for each frame
+    """
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.frame_nanoseconds = 0
+        """The number of nanoseconds spent in the current frame"""
+        self.samples: Deque[int] = deque(maxlen=FRAME_WINDOW)
+
+    def end_frame(self):
+        self.samples.append(self.frame_nanoseconds)
+        self.frame_nanoseconds = 0
+
+    def get_percentile_microseconds(self, percentile: float) -> float:
+        if not self.samples:
+            return 0.0
+        return float(np.percentile(self.samples, percentile)) / 1000
+
+
+class ProfiledAlter(Alter):
+    """
+    Wraps an alter and records how long it takes. The time includes the time spent in any alters that the wrapped alter is composed of.
+    """
+    def __init__(self, alter: Alter, profile: AlterProfile):
+        self.alter = alter
+        self.profile = profile
+
+    def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
+        start = time.perf_counter_ns()
+        result = self.alter.alter_pixel(seconds, pixel_position, current_color, metadata)
+        self.profile.frame_nanoseconds += time.perf_counter_ns() - start
+        return result
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        start = time.perf_counter_ns()
+        self.alter.render(seconds, positions, buffer, metadata)
+        self.profile.frame_nanoseconds += time.perf_counter_ns() - start
+
+    def begin_frame(self, seconds: float) -> None:
+        start = time.perf_counter_ns()
+        self.alter.begin_frame(seconds)
+        self.profile.frame_nanoseconds += time.perf_counter_ns() - start
+
+    def end_frame(self) -> None:
+        self.alter.end_frame()
+
+    def is_static(self) -> bool:
+        return self.alter.is_static()
+
+
+class Profiler:
+    """
+    Instruments alters so that the time spent in each one can be reported.
+    Alters that are not passed to :meth:`instrument` are not affected, so there is no overhead when profiling is not used.
+    """
+    def __init__(self):
+        self.profiles: List[AlterProfile] = []
+
+    def instrument(self, alter: Alter) -> Alter:
+        """
+        Replaces the profiles from the last call to this method.
+        :return: A copy of the given alter where it and every alter it is composed of is wrapped with a :class:`ProfiledAlter`
+        """
+        self.profiles = []
+        return self._instrument(alter, 0)
+
+    def _instrument(self, alter: Alter, depth: int) -> Alter:
+        profile = AlterProfile(alter.__class__.__name__, depth)
+        self.profiles.append(profile)
+        return ProfiledAlter(map_children(alter, lambda child: self._instrument(child, depth + 1)), profile)
+
+    def end_frame(self):
+        """
+        Should be called after each frame is rendered
+        """
+        for profile in self.profiles:
+            profile.end_frame()
+
+    def report(self) -> str:
+        lines = [f"{'alter':<40} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10}"]
+        for profile in self.profiles:
+            name = "  " * profile.depth + profile.name
+            lines.append(
+                f"{name:<40} {profile.get_percentile_microseconds(50):>10.1f} "
+                f"{profile.get_percentile_microseconds(90):>10.1f} {profile.get_percentile_microseconds(99):>10.1f}"
+            )
+        return "\n".join(lines)
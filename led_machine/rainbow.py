@@ -1,15 +1,23 @@
 import math
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
+
 from led_machine.alter import Alter, Position, LedMetadata
 from led_machine.color import Color
+from led_machine.frame import FrameBuffer
 from led_machine.percent import PercentGetter
 
+DEFAULT_RAINBOW_RESOLUTION = 6 * 256
+"""The default number of colors in a rainbow table. This is enough for every color to be within 1/255 of :func:`get_rainbow`."""
+
 
 class AlterRainbow(Alter):
-    def __init__(self, percent_getter: PercentGetter, led_spread: float):
+    def __init__(self, percent_getter: PercentGetter, led_spread: float, resolution: int = DEFAULT_RAINBOW_RESOLUTION):
         self.percent_getter: PercentGetter = percent_getter
         self.led_spread = led_spread
+        self.rainbow_table = get_rainbow_table(resolution)
 
     def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
         percent = self.percent_getter.get_percent(seconds)
@@ -17,24 +25,76 @@ class AlterRainbow(Alter):
         led_spread = self.led_spread
         return get_rainbow((percent + pixel_position / led_spread) % 1)
 
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        percent = self.percent_getter.get_percent(seconds)
+        buffer.colors[:] = lookup_rainbow(self.rainbow_table, (percent + positions / self.led_spread) % 1)
+        buffer.valid[:] = True
+
+    def begin_frame(self, seconds: float) -> None:
+        self.percent_getter.begin_frame(seconds)
+
+    def is_static(self) -> bool:
+        return self.percent_getter.is_static()
+
 
 def get_rainbow(percent: float) -> Color:
     spot = int(percent * 6)
     sub = (percent * 6) % 1
     cosine_adjust = 1 - (math.cos(sub * math.pi) + 1) / 2
     amount = (sub + cosine_adjust) / 2.0
+    # amount is always in range [0..1], so there's no need to check the values
     if spot == 0:  # add red
-        return Color(amount, 1.0, 0.0)
+        return Color.create_unchecked(amount, 1.0, 0.0)
     elif spot == 1:  # remove green
-        return Color(1.0, 1.0 - amount, 0.0)
+        return Color.create_unchecked(1.0, 1.0 - amount, 0.0)
     elif spot == 2:  # add blue
-        return Color(1.0, 0.0, amount)
+        return Color.create_unchecked(1.0, 0.0, amount)
     elif spot == 3:  # remove red
-        return Color(1 - amount, 0.0, 1.0)
+        return Color.create_unchecked(1 - amount, 0.0, 1.0)
     elif spot == 4:  # add green
-        return Color(0.0, amount, 1.0)
+        return Color.create_unchecked(0.0, amount, 1.0)
     else:  # remove blue
-        return Color(0.0, 1.0, 1.0 - amount)
+        return Color.create_unchecked(0.0, 1.0, 1.0 - amount)
+
+
+def get_rainbow_array(percents: np.ndarray) -> np.ndarray:
+    """
+    The same as :func:`get_rainbow`, but for many percents at once.
+    :return: An array with shape (len(percents), 3)
+    """
+    spot = np.minimum((percents * 6).astype(int), 5)
+    sub = (percents * 6) % 1
+    cosine_adjust = 1 - (np.cos(sub * math.pi) + 1) / 2
+    amount = (sub + cosine_adjust) / 2.0
+    inverse = 1.0 - amount
+    zeros = np.zeros_like(amount)
+    ones = np.ones_like(amount)
+    return np.stack([
+        np.choose(spot, [amount, ones, ones, inverse, zeros, zeros]),
+        np.choose(spot, [ones, inverse, zeros, zeros, amount, ones]),
+        np.choose(spot, [zeros, zeros, amount, ones, ones, inverse]),
+    ], axis=1)
+
+
+@lru_cache(maxsize=None)
+def get_rainbow_table(resolution: int = DEFAULT_RAINBOW_RESOLUTION) -> np.ndarray:
+    """
+    The returned table is shared between every caller that uses the same resolution, so it is read only.
+    :return: An array with shape (resolution, 3) where row i is the color of get_rainbow(i / resolution)
+    """
+    table = get_rainbow_array(np.arange(resolution) / resolution).astype(np.float32)
+    table.flags.writeable = False
+    return table
+
+
+def lookup_rainbow(rainbow_table: np.ndarray, percents: np.ndarray) -> np.ndarray:
+    """
+    :param rainbow_table: A table from :func:`get_rainbow_table`
+    :param percents: An array of percents in range [0..1]
+    :return: An array with shape (len(percents), 3) containing the closest color in the table for each percent
+    """
+    resolution = len(rainbow_table)
+    return rainbow_table[np.rint(percents * resolution).astype(int) % resolution]
 
 
 if __name__ == '__main__':
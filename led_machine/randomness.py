@@ -0,0 +1,24 @@
+"""
+A random number generator shared by every pattern that uses randomness. Patterns get many random numbers at once from it using NumPy.
+Calling :func:`seed_random` before patterns are created makes them do exactly the same thing each time they are run.
+"""
+from typing import Optional
+
+import numpy as np
+
+_generator: np.random.Generator = np.random.default_rng()
+
+
+def get_random() -> np.random.Generator:
+    """
+    Patterns should call this when they are created and keep the result, so that seeding only affects patterns created after it.
+    """
+    return _generator
+
+
+def seed_random(seed: Optional[int]):
+    """
+    Replaces the shared generator with one created from the given seed. If seed is None, the new generator is not reproducible.
+    """
+    global _generator
+    _generator = np.random.default_rng(seed)
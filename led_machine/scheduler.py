@@ -0,0 +1,74 @@
+import time
+from typing import Optional, Callable
+
+MAX_CATCH_UP_FRAMES = 5
+"""The maximum number of frames that can be rendered back to back to catch up before the remaining frames are skipped"""
+
+STATS_SMOOTHING = 0.05
+"""The weight given to each new frame interval for the running averages"""
+
+
+class FrameScheduler:
+    """
+    Paces a render loop to a target frame rate. Each frame has a deadline, and :meth:`wait` sleeps until that deadline
+    rather than for a fixed amount of time, so the frame rate does not depend on how long a frame takes to render.
+    """
+    def __init__(
+        self, target_fps: float, catch_up: bool = False,
+        clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        :param target_fps: The number of frames per second to render
+        :param catch_up: When a frame takes longer than it should, True will render frames back to back to make up for the missed frames.
+        False will skip the missed frames and continue the schedule from the current time.
+        """
+        if target_fps <= 0:
+            raise ValueError(f"target_fps must be positive! target_fps: {target_fps}")
+        self.period = 1.0 / target_fps
+        self.catch_up = catch_up
+        self.clock = clock
+        self.sleep = sleep
+
+        self.next_deadline: Optional[float] = None
+        self.last_frame_time: Optional[float] = None
+
+        self.frame_count = 0
+        self.skipped_frames = 0
+        self.average_interval = self.period
+        """A running average of the number of seconds between frames"""
+        self.jitter = 0.0
+        """A running average of the number of seconds that the time between frames differs from the period"""
+
+    @property
+    def fps(self) -> float:
+        """The achieved frames per second"""
+        return 1.0 / self.average_interval if self.average_interval > 0 else 0.0
+
+    def wait(self):
+        """
+        Sleeps until it is time to render the next frame. This should be called once before rendering each frame.
+        """
+        now = self.clock()
+        if self.next_deadline is None:
+            self.next_deadline = now
+        elif now < self.next_deadline:
+            self.sleep(self.next_deadline - now)
+            now = self.clock()
+        else:
+            missed_frames = int((now - self.next_deadline) / self.period)
+            if missed_frames > 0 and (not self.catch_up or missed_frames > MAX_CATCH_UP_FRAMES):
+                self.skipped_frames += missed_frames
+                self.next_deadline = now
+            # else the deadline is already in the past, so the next few frames are rendered back to back to catch up
+
+        if self.last_frame_time is not None:
+            interval = now - self.last_frame_time
+            self.average_interval += (interval - self.average_interval) * STATS_SMOOTHING
+            self.jitter += (abs(interval - self.period) - self.jitter) * STATS_SMOOTHING
+        self.last_frame_time = now
+        self.frame_count += 1
+        self.next_deadline += self.period
+
+    def __str__(self):
+        return f"FrameScheduler(target_fps={1.0 / self.period:.1f}, fps={self.fps:.1f}, jitter={self.jitter * 1000:.2f}ms, " \
+               f"frames={self.frame_count}, skipped_frames={self.skipped_frames})"
@@ -1,10 +1,12 @@
 import sys
 import time
 import tkinter
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from led_machine import ColorConstants, LedState, MessageContext, AlterMultiplexer, LedMetadata, handle_message
-from led_machine.color import Color
+import numpy as np
+
+from led_machine import LedState, MessageContext, AlterMultiplexer, LedMetadata, handle_message, FrameBuffer, compile_alter
+from led_machine.alter import Alter
 
 '''
 sudo apt install python3-tk
@@ -41,10 +43,13 @@ def main():
     main_led_state = LedState(NUMBER_OF_PIXELS)
 
     spots = [canvas.create_rectangle(i * PIXEL_SIZE, 0, (i + 1) * PIXEL_SIZE, PIXEL_SIZE * 6, fill="black") for i in range(NUMBER_OF_PIXELS)]
-    old_colors: List[Optional[Color]] = [None] * NUMBER_OF_PIXELS
+    old_colors: List[Optional[Tuple[int, int, int]]] = [None] * NUMBER_OF_PIXELS
+    positions = np.arange(NUMBER_OF_PIXELS)
+    buffer = FrameBuffer(NUMBER_OF_PIXELS)
 
     canvas.pack(fill="both", expand=True)
 
+    setting: Optional[Alter] = None
     while True:
 
         for message in get_lines():
@@ -53,20 +58,26 @@ def main():
             context = MessageContext()
 
             handle_message(text, main_led_state, False, context)
+            setting = None
+
+        if setting is None:
+            setting = compile_alter(AlterMultiplexer([
+                main_led_state.main_alter,
+                main_led_state.pattern_alter,
+            ]))
 
         seconds = time.time()
 
-        setting = AlterMultiplexer([
-            main_led_state.main_alter,
-            main_led_state.pattern_alter,
-        ])
         metadata = LedMetadata()
+        buffer.clear()
+        setting.begin_frame(seconds)
+        setting.render(seconds, positions, buffer, metadata)
+        setting.end_frame()
 
-        for i, spot in enumerate(spots):
-            color = setting.alter_pixel(seconds, i, None, metadata) or ColorConstants.BLACK
+        for i, (spot, color) in enumerate(zip(spots, buffer.to_tuples())):
             old_color = old_colors[i]
-            if old_color is None or old_color.tuple != color.tuple:
-                new_color = f"#{color.tuple[0]:02x}{color.tuple[1]:02x}{color.tuple[2]:02x}"
+            if old_color is None or old_color != color:
+                new_color = f"#{color[0]:02x}{color[1]:02x}{color[2]:02x}"
                 canvas.itemconfig(spot, fill=new_color)
                 old_colors[i] = color
 
@@ -1,7 +1,5 @@
-from queue import Queue
-from typing import Optional
-from urllib.error import URLError
-import time
+from queue import Queue, Empty
+from threading import Thread, Event
 
 from slack_sdk import WebClient
 from slack_sdk.socket_mode import SocketModeClient
@@ -9,14 +7,21 @@ from slack_sdk.socket_mode import SocketModeClient
 from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.socket_mode.response import SocketModeResponse
 
+CHECK_CONNECTED_PERIOD = 1.0
+"""The number of seconds between each check to see if we are still connected"""
+MIN_RECONNECT_DELAY = 10.0
+MAX_RECONNECT_DELAY = 5 * 60.0
+
 
 class SlackHelper:
     def __init__(self, bot_token, app_token, channel):
         self.bot_token = bot_token
         self.app_token = app_token
         self.channel = channel
-        self.message_queue = Queue()
-        self.last_connect_try: Optional[float] = None
+        self.message_queue: Queue = Queue()
+        self.reconnect_delay = MIN_RECONNECT_DELAY
+        """The number of seconds to wait before trying to connect again. This doubles after each failed attempt."""
+        self.stop_event = Event()
 
         print("Initializing SlackHelper")
         self.socket_client = SocketModeClient(
@@ -24,24 +29,42 @@ class SlackHelper:
             web_client=WebClient(token=self.bot_token)
         )
         self.socket_client.socket_mode_request_listeners.append(lambda client, req: self._process_event(client, req))
-        self.check_connected()
+        # Connecting may block for a long time, so we do it in the background to keep the LEDs from freezing
+        self.connection_thread = Thread(target=self._run_connection, name="SlackHelper", daemon=True)
+        self.connection_thread.start()
         print("Finished initializing SlackHelper")
 
     def __del__(self):
+        self.close()
+
+    def close(self):
+        self.stop_event.set()
         self.socket_client.close()
 
-    def check_connected(self):
-        if not self.socket_client.is_connected():
-            now = time.time()
-            if self.last_connect_try is not None and self.last_connect_try + 10 > now:
-                return  # We've tried in the last 10 seconds
-            print("Going to try to connect")
-            try:
-                self.socket_client.connect()
-                print("Connected")
-            except URLError:
-                print("Could not connect")
-            self.last_connect_try = now
+    def _run_connection(self):
+        while not self.stop_event.is_set():
+            if self.check_connected():
+                self.stop_event.wait(CHECK_CONNECTED_PERIOD)
+            else:
+                self.stop_event.wait(self.reconnect_delay)
+                self.reconnect_delay = min(MAX_RECONNECT_DELAY, self.reconnect_delay * 2)
+
+    def check_connected(self) -> bool:
+        """
+        Tries to connect if we are not connected. This may block, so it should only be called from the connection thread.
+        :return: True if we are connected, False otherwise
+        """
+        if self.socket_client.is_connected():
+            return True
+        print("Going to try to connect")
+        try:
+            self.socket_client.connect()
+        except Exception as e:  # there are many different errors (socket, SSL, Slack API) that can happen while connecting
+            print(f"Could not connect: {e!r}. Trying again in {self.reconnect_delay} seconds")
+            return False
+        print("Connected")
+        self.reconnect_delay = MIN_RECONNECT_DELAY
+        return True
 
     def _process_event(self, client: SocketModeClient, req: SocketModeRequest):
         if req.type == "events_api":
@@ -61,9 +84,13 @@ class SlackHelper:
                 # ))
 
     def new_messages(self) -> list:
-        self.check_connected()  # We don't really care if this blocks
+        """
+        :return: The messages that have been received since the last call. This never blocks.
+        """
         messages = []
-        while not self.message_queue.empty():
-            messages.append(self.message_queue.get())
-        return messages
+        while True:
+            try:
+                messages.append(self.message_queue.get_nowait())
+            except Empty:
+                return messages
 
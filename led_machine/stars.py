@@ -1,26 +1,17 @@
-from random import randint, uniform
-from typing import Optional, List, Callable
+from typing import Optional
+
+import numpy as np
 
 from led_machine.alter import Alter, Position, LedMetadata
 from led_machine.color import Color
-from led_machine.types import TimeMultiplierGetter
+from led_machine.frame import FrameBuffer
+from led_machine.randomness import get_random
+from led_machine.types import TimeMultiplierGetter, STOPPED_TIME_MULTIPLIER
 
 MAX_DELTA = 0.3
 STAR_PER_PIXEL = 1 / 12
 
 
-class Star:
-    def __init__(self):
-        self.position: float = 0.0
-        self.velocity: float = 0.0
-        self.brightness: float = 1.0
-        self.thickness: float = 0.0
-        self.fade_distance_left: float = 1.5
-        self.fade_distance_right: float = 1.5
-        self.brightness_left: float = 0.9
-        self.brightness_right: float = 0.9
-
-
 class AlterStar(Alter):
 
     def __init__(self, expected_pixels: int, padding: int, time_multiplier_getter: TimeMultiplierGetter, reverse: bool = False):
@@ -29,61 +20,107 @@ class AlterStar(Alter):
 
         self.spawn_lower = -padding
         self.spawn_upper = expected_pixels + padding
-        self.stars: List[Star] = []
         self.last_seconds: Optional[float] = None
 
+        random = get_random()
         total_distance = expected_pixels + padding * 2
         total_stars = int(total_distance * STAR_PER_PIXEL)
-        for i in range(total_stars):
-            star = Star()
-            self.stars.append(star)
-            star.position = randint(self.spawn_lower, self.spawn_upper)
-            star.velocity = (randint(0, 1) * 2 - 1) * uniform(0.3, 1.5)
-            if reverse:
-                star.thickness = 2.0
-            else:
-                # only have a random brightness if we aren't doing reverse
-                star.brightness = uniform(0.2, 0.8)
-            star.brightness_left = star.brightness
-            star.brightness_right = star.brightness
-
-        shooting_star = Star()
-        self.stars.append(shooting_star)
-        shooting_star.thickness = 1.0
-        shooting_star.fade_distance_right = 4.0
-        shooting_star.fade_distance_left = 1.0
-        shooting_star.brightness_right = 0.1
-        shooting_star.velocity = -10.0
+        # Each star is stored as an element of these arrays so that they can all be moved and drawn at once.
+        # The last star is a shooting star.
+        positions = random.integers(self.spawn_lower, self.spawn_upper, endpoint=True, size=total_stars)
+        velocities = (random.integers(0, 1, endpoint=True, size=total_stars) * 2 - 1) * random.uniform(0.3, 1.5, size=total_stars)
+        if reverse:
+            brightness = np.ones(total_stars)
+            thickness = np.full(total_stars, 2.0)
+        else:
+            # only have a random brightness if we aren't doing reverse
+            brightness = random.uniform(0.2, 0.8, size=total_stars)
+            thickness = np.zeros(total_stars)
+        self.star_positions = np.append(positions, 0.0)
+        self.star_velocities = np.append(velocities, -10.0)
+        self.star_brightness = np.append(brightness, 1.0)
+        self.star_thickness = np.append(thickness, 1.0)
+        self.star_fade_distance_left = np.append(np.full(total_stars, 1.5), 1.0)
+        self.star_fade_distance_right = np.append(np.full(total_stars, 1.5), 4.0)
+        self.star_brightness_left = np.append(brightness, 0.9)
+        self.star_brightness_right = np.append(brightness, 0.1)
+        footprint_width = int(np.ceil(np.max(self.star_thickness + self.star_fade_distance_left + self.star_fade_distance_right)))
+        self.footprint_offsets = np.arange(footprint_width + 1)
+        """The offset of each pixel a star could light up from the first pixel it could light up"""
 
-    def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
+    def begin_frame(self, seconds: float) -> None:
+        """
+        Moves every star
+        """
         delta = 0.0
         if self.last_seconds is not None:
             delta = seconds - self.last_seconds
         self.last_seconds = seconds
 
         if delta > 0:
-            for star in self.stars:
-                star.position += star.velocity * delta * self.time_multiplier_getter()  # instead of altering seconds, just increase the speed by this multiplier
-                if star.position > self.spawn_upper:
-                    star.position = self.spawn_lower + (star.position - self.spawn_upper)
-                elif star.position < self.spawn_lower:
-                    star.position = self.spawn_upper - (self.spawn_lower - star.position)
+            # instead of altering seconds, just increase the speed by this multiplier
+            positions = self.star_positions + self.star_velocities * delta * self.time_multiplier_getter()
+            above = positions > self.spawn_upper
+            below = positions < self.spawn_lower
+            positions[above] = self.spawn_lower + (positions[above] - self.spawn_upper)
+            positions[below] = self.spawn_upper - (self.spawn_lower - positions[below])
+            self.star_positions = positions
+
+    def _get_star_brightness(self, pixel_positions) -> np.ndarray:
+        """
+        :param pixel_positions: A number, or an array where the first dimension is the star
+        :return: The brightness that each star gives to each pixel position
+        """
+        shape = (-1,) + (1,) * (np.ndim(pixel_positions) - 1)
+        lower = (self.star_positions - self.star_thickness / 2).reshape(shape)
+        upper = (self.star_positions + self.star_thickness / 2).reshape(shape)
+        fade_distance_left = self.star_fade_distance_left.reshape(shape)
+        fade_distance_right = self.star_fade_distance_right.reshape(shape)
+        return np.select(
+            [
+                (lower <= pixel_positions) & (pixel_positions <= upper),
+                (lower - fade_distance_left <= pixel_positions) & (pixel_positions < lower),  # 3.5 to 4
+                (upper < pixel_positions) & (pixel_positions <= upper + fade_distance_right),
+            ],
+            [
+                np.broadcast_to(self.star_brightness.reshape(shape), np.shape(lower)),
+                (pixel_positions - (lower - fade_distance_left)) / fade_distance_left * self.star_brightness_left.reshape(shape),
+                ((upper + fade_distance_right) - pixel_positions) / fade_distance_right * self.star_brightness_right.reshape(shape),
+            ],
+            0.0
+        )
 
+    def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
         if not current_color:
             return None
 
-        brightness = 0.0
-        for star in self.stars:
-            lower = star.position - star.thickness / 2
-            upper = star.position + star.thickness / 2
-            if lower <= pixel_position <= upper:
-                brightness = max(brightness, star.brightness)
-            elif lower - star.fade_distance_left <= pixel_position < lower:  # 3.5 to 4
-                brightness = max(brightness, (pixel_position - (lower - star.fade_distance_left)) / star.fade_distance_left * star.brightness_left)
-            elif upper < pixel_position <= upper + star.fade_distance_right:
-                brightness = max(brightness, ((upper + star.fade_distance_right) - pixel_position) / star.fade_distance_right * star.brightness_right)
-
+        brightness = max(0.0, float(np.max(self._get_star_brightness(pixel_position))))
         assert 0.0 <= brightness <= 1.0, f"Brightness is {brightness}"
         if self.reverse:
             brightness = 1 - brightness
         return current_color.scale(brightness)
+
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        if not np.issubdtype(positions.dtype, np.integer):
+            super().render(seconds, positions, buffer, metadata)
+            return
+        if len(positions) == 0:
+            return
+
+        # Each star only lights up the few pixels around it, so each star is drawn onto a brightness for every pixel in range
+        offset = int(positions.min())
+        brightness = np.zeros(int(positions.max()) - offset + 1)
+        first_pixels = np.ceil(self.star_positions - self.star_thickness / 2 - self.star_fade_distance_left).astype(int)
+        pixels = first_pixels[:, np.newaxis] + self.footprint_offsets
+        star_brightness = self._get_star_brightness(pixels)
+        indices = pixels - offset
+        inside = (indices >= 0) & (indices < len(brightness)) & (star_brightness > 0)
+        np.maximum.at(brightness, indices[inside], star_brightness[inside])
+
+        pixel_brightness = brightness[positions - offset]
+        if self.reverse:
+            pixel_brightness = 1 - pixel_brightness
+        buffer.colors *= pixel_brightness[:, np.newaxis]
+
+    def is_static(self) -> bool:
+        return self.time_multiplier_getter() <= STOPPED_TIME_MULTIPLIER
@@ -1,6 +1,30 @@
+import socket
+import time
 import unittest
+from functools import partial
+from unittest import mock
 
-from led_machine.color import Color
+import numpy as np
+
+from led_machine.alter import AlterMultiplexer, LedMetadata, AlterDim, AlterNothing, AlterSolid, AlterSpeedOfAlter
+from led_machine.benchmark import FakePixels, PatternRunner, create_benchmark_led_states, create_benchmark_setting, START_SECONDS, FRAME_SECONDS
+from led_machine.blend import AlterBlend
+from led_machine.block import AlterBlock
+from led_machine.color import Color, ColorConstants
+from led_machine.fade import AlterFade, create_fade_palette, PALETTE_STEPS_PER_COLOR, MAX_PALETTE_SIZE
+from led_machine.color_parse import parse_colors, DEEP_PURPLE, HOT_PURPLE, PURPLE, CYAN
+from led_machine.frame import FrameBuffer
+from led_machine.handler import LedState, handle_message, MessageContext, START_PIXELS_TO_HIDE, STORM1
+from led_machine.output import PixelOutput
+from led_machine.parallel import ParallelRenderer
+from led_machine.partition import AlterPartition
+from led_machine.percent import PercentGetterTimeMultiplier, FrameCachedPercentGetter, BouncePercentGetter, ConstantPercentGetter, SmoothPercentGetter
+from led_machine.plan import compile_alter, RenderPlan
+from led_machine.profiling import Profiler
+from led_machine.rainbow import get_rainbow, get_rainbow_table, lookup_rainbow
+from led_machine.scheduler import FrameScheduler
+from led_machine.slack import SlackHelper
+from led_machine.twinkle import AlterTwinkle
 
 
 class ColorTest(unittest.TestCase):
@@ -19,6 +43,478 @@ class ColorTest(unittest.TestCase):
             self.assertEqual(ng, color1._g)
             self.assertEqual(nb, color1._b)
 
+    def test_unchecked(self):
+        self.assertEqual(ColorConstants.WHITE, Color.from_bytes(255, 255, 255))
+        color = Color.from_bytes(200, 100, 50).lerp(ColorConstants.BLACK, 0.5)
+        self.assertEqual(Color(100 / 255, 50 / 255, 25 / 255), color)
+        self.assertEqual((100, 50, 25), color.tuple)
+        self.assertEqual((0, 0, 0), Color.create_unchecked(0.0, 0.0, 0.0).tuple)
+
+
+class ColorParseTest(unittest.TestCase):
+    def test_parse(self):
+        red = Color.from_bytes(255, 0, 0)
+        blue = Color.from_bytes(0, 0, 255)
+        self.assertEqual([DEEP_PURPLE, HOT_PURPLE, DEEP_PURPLE, DEEP_PURPLE], parse_colors("deep purple hot purple deeppurple purple deep"))
+        self.assertEqual([PURPLE, red], parse_colors("purple deep red"))
+        self.assertEqual([red, blue, CYAN, CYAN, Color.from_bytes(165, 42, 23)], parse_colors("Reddish blue teal cyan brownish-red"))
+        self.assertEqual([red, Color.from_bytes(0x12, 0x34, 0x56)], parse_colors("#f00 #123456 #12 #ggg"))
+
+    def test_parse_cached(self):
+        colors = parse_colors("red blue")
+        colors.append(ColorConstants.WHITE)  # The returned list is a copy, so changing it does not affect the cache
+        self.assertEqual(2, len(parse_colors("red blue")))
+
+
+class RenderTest(unittest.TestCase):
+    messages = [
+        "rainbow", "fat rainbow", "red blue green", "solid red blue", "pixel red blue green", "red", "off",
+        "carnival", "long carnival", "bounce", "single", "star", "reverse star", "twinkle", "north red blue green", "red | blue green",
+        "offset side_half red | blue", "red blue ~ green", "red ~ (blue ~ rainbow)", "star ~ red | green",
+    ]
+
+    def test_render_same_as_alter_pixel(self):
+        number_of_pixels = 450
+        positions = np.arange(number_of_pixels)
+        for message in self.messages:
+            with self.subTest(message=message):
+                led_state = LedState(number_of_pixels)
+                handle_message(message, led_state, False, MessageContext())
+                setting = AlterMultiplexer([led_state.main_alter, led_state.pattern_alter, AlterDim(0.8)])
+                for seconds in [1618793494.672, 1618793500.25]:
+                    buffer = FrameBuffer(number_of_pixels)
+                    setting.begin_frame(seconds)
+                    setting.render(seconds, positions, buffer, LedMetadata())
+                    expected = [(setting.alter_pixel(seconds, i, None, LedMetadata()) or ColorConstants.BLACK).tuple for i in range(number_of_pixels)]
+                    actual = buffer.to_tuples()
+                    for expected_color, actual_color in zip(expected, actual):
+                        for a, b in zip(expected_color, actual_color):
+                            self.assertLessEqual(abs(a - b), 1)
+
+    def test_compiled_plan_same_as_alter(self):
+        number_of_pixels = 450
+        positions = np.arange(number_of_pixels)
+        for message in self.messages:
+            with self.subTest(message=message):
+                led_state = LedState(number_of_pixels)
+                lamp_led_state = LedState(number_of_pixels)
+                lamp_led_state.main_alter = AlterNothing()
+                handle_message(message, led_state, False, MessageContext())
+                handle_message("lamp josh white", lamp_led_state, True, MessageContext())
+                alters = [
+                    led_state.main_alter,
+                    led_state.pattern_alter,
+                    AlterPartition([(AlterMultiplexer([lamp_led_state.main_alter, lamp_led_state.pattern_alter]), [(START_PIXELS_TO_HIDE, 17)])]),
+                ]
+                setting = AlterMultiplexer(alters + [
+                    AlterBlock([(ColorConstants.BLACK, START_PIXELS_TO_HIDE), (None, number_of_pixels - START_PIXELS_TO_HIDE)],
+                               ConstantPercentGetter(0.0), fade=False),
+                    AlterDim(0.8),
+                ])
+                plan = RenderPlan(compile_alter(AlterMultiplexer(alters + [AlterDim(0.8)])), positions < START_PIXELS_TO_HIDE)
+                seconds = 1618793494.672
+                expected = FrameBuffer(number_of_pixels)
+                setting.begin_frame(seconds)  # the plan shares the alters that have state, so this is only done once
+                setting.render(seconds, positions, expected, LedMetadata())
+                actual = FrameBuffer(number_of_pixels)
+                plan.render(seconds, positions, actual, LedMetadata())
+                np.testing.assert_array_equal(expected.valid, actual.valid)
+                np.testing.assert_allclose(expected.to_bytes().astype(int), actual.to_bytes().astype(int), atol=1)
+
+    def test_static(self):
+        for message, static in [("red", True), ("off", True), ("rainbow", False), ("rainbow stop", True), ("red | blue", True), ("red | rainbow", False),
+                                ("red ~ blue", False), ("red | blue carnival", False), ("red carnival stop", True), ("star", False)]:
+            with self.subTest(message=message):
+                led_state = LedState(450)
+                handle_message(message, led_state, False, MessageContext())
+                self.assertEqual(static, compile_alter(AlterMultiplexer([led_state.main_alter, led_state.pattern_alter])).is_static())
+
+    def test_static_plan_renders_once(self):
+        calls = []
+
+        class CountingAlter(AlterSolid):
+            def render(self, seconds, positions, buffer, metadata):
+                calls.append(seconds)
+                super().render(seconds, positions, buffer, metadata)
+        plan = RenderPlan(CountingAlter((255, 0, 0)), np.arange(10) < 2)
+        positions = np.arange(10)
+        for seconds in range(3):
+            buffer = FrameBuffer(10)
+            plan.render(seconds, positions, buffer, LedMetadata())
+            self.assertEqual([(0, 0, 0)] * 2 + [(255, 0, 0)] * 8, buffer.to_tuples())
+        self.assertEqual(1, len(calls))
+
+    def test_compile_flattens(self):
+        solid = AlterSolid((255, 0, 0))
+        compiled = compile_alter(AlterMultiplexer([AlterNothing(), AlterMultiplexer([AlterDim(0.5), solid, AlterNothing()]), AlterDim(0.5), AlterDim(0.5)]))
+        self.assertIsInstance(compiled, AlterSolid)
+        self.assertEqual(Color(0.25, 0.0, 0.0), compiled.color)
+
+    def test_profiled_same_as_alter(self):
+        led_state = LedState(450)
+        handle_message("red blue green | carnival rainbow", led_state, False, MessageContext())
+        setting = compile_alter(AlterMultiplexer([led_state.main_alter, led_state.pattern_alter]))
+        profiler = Profiler()
+        profiled = profiler.instrument(setting)
+        positions = np.arange(450)
+        expected = FrameBuffer(450)
+        setting.render(1618793494.672, positions, expected, LedMetadata())
+        actual = FrameBuffer(450)
+        profiled.render(1618793494.672, positions, actual, LedMetadata())
+        profiler.end_frame()
+        np.testing.assert_array_equal(expected.colors, actual.colors)
+        self.assertEqual(["AlterPartition", "AlterFade", "AlterMultiplexer", "AlterRainbow", "AlterBlock"], [profile.name for profile in profiler.profiles])
+        self.assertEqual(len(profiler.profiles) + 1, len(profiler.report().splitlines()))
+
+
+class RainbowTest(unittest.TestCase):
+    def test_table_close_to_get_rainbow(self):
+        percents = np.linspace(0.0, 1.0, 100000, endpoint=False)
+        expected = np.array([(color._r, color._g, color._b) for color in map(get_rainbow, percents.tolist())])
+        actual = lookup_rainbow(get_rainbow_table(), percents)
+        self.assertLessEqual(float(np.abs(expected - actual).max()), 1 / 255)
+        self.assertIs(get_rainbow_table(), get_rainbow_table())
+
+
+class FadeTest(unittest.TestCase):
+    def test_palette_close_to_get_color(self):
+        percents = np.linspace(0.0, 1.0, 20000, endpoint=False)
+        for colors in [parse_colors("red blue"), parse_colors(STORM1)]:
+            with self.subTest(number_of_colors=len(colors)):
+                fade = AlterFade(ConstantPercentGetter(0.0), colors, 30)
+                palette = create_fade_palette(fade.colors)
+                expected = np.array([(color._r, color._g, color._b) for color in map(fade._get_color, percents.tolist())])
+                actual = palette[np.rint(percents * len(palette)).astype(int) % len(palette)]
+                self.assertLessEqual(float(np.abs(expected - actual).max()), 1 / 255)
+
+    def test_render_without_palette(self):
+        colors = parse_colors(STORM1)
+        self.assertGreater(len(colors) * PALETTE_STEPS_PER_COLOR, MAX_PALETTE_SIZE)
+        fade = AlterFade(ConstantPercentGetter(0.3), colors, 4000)
+        self.assertIsNone(fade.palette)
+        buffer = FrameBuffer(450)
+        fade.render(0.0, np.arange(450), buffer, LedMetadata())
+        expected = np.array([(color._r, color._g, color._b) for color in (fade.alter_pixel(0.0, i, None, LedMetadata()) for i in range(450))])
+        np.testing.assert_allclose(expected, buffer.colors, atol=1e-5)
+
+
+class BlockTest(unittest.TestCase):
+    def test_get_color(self):
+        red = Color.from_bytes(255, 0, 0)
+        blue = Color.from_bytes(0, 0, 255)
+        block = AlterBlock([(red, 2), (None, 1), (blue, 3)], ConstantPercentGetter(0.0))
+        self.assertEqual([red, red, None, blue, blue, blue], [block._get_color(pixel) for pixel in range(6)])
+        self.assertRaises(AssertionError, block._get_color, 6)
+
+
+class PartitionTest(unittest.TestCase):
+    def test_first_partition_wins(self):
+        red = AlterSolid((255, 0, 0))
+        blue = AlterSolid((0, 0, 255))
+        partition = AlterPartition([(red, [(2, 3)]), (blue, [(0, 4), (8, 10)])])
+        positions = np.arange(10)
+        buffer = FrameBuffer(10)
+        partition.render(0.0, positions, buffer, LedMetadata())
+        expected = [blue, blue, red, red, red, None, None, None, blue, blue]
+        for i, alter in enumerate(expected):
+            self.assertEqual(alter is not None, buffer.valid[i])
+            self.assertEqual(None if alter is None else alter.color, partition.alter_pixel(0.0, i, None, LedMetadata()))
+            if alter is not None:
+                self.assertEqual(alter.color, buffer.get_color(i))
+
+    def test_same_positions_given_to_children(self):
+        given_positions = []
+
+        class RecordingAlter(AlterSolid):
+            def render(self, seconds, positions, buffer, metadata):
+                given_positions.append(positions)
+                super().render(seconds, positions, buffer, metadata)
+        partition = AlterPartition([(RecordingAlter((255, 0, 0)), [(2, 3)])])
+        positions = np.arange(10)
+        for seconds in range(2):
+            partition.render(seconds, positions, FrameBuffer(10), LedMetadata())
+        self.assertIs(given_positions[0], given_positions[1])
+
+    def test_child_with_two_ranges_rendered_once(self):
+        given_positions = []
+
+        class RecordingAlter(AlterSolid):
+            def render(self, seconds, positions, buffer, metadata):
+                given_positions.append(positions)
+                super().render(seconds, positions, buffer, metadata)
+        partition = AlterPartition([(RecordingAlter((255, 0, 0)), [(0, 2), (6, 3)]), (AlterSolid((0, 0, 255)), [(0, 10)])])
+        positions = np.arange(10)
+        for seconds in range(2):
+            buffer = FrameBuffer(10)
+            partition.render(seconds, positions, buffer, LedMetadata())
+            self.assertEqual([(255, 0, 0)] * 2 + [(0, 0, 255)] * 4 + [(255, 0, 0)] * 3 + [(0, 0, 255)], buffer.to_tuples())
+        self.assertEqual(2, len(given_positions))
+        self.assertIs(given_positions[0], given_positions[1])
+        self.assertEqual([0, 1, 6, 7, 8], list(given_positions[0]))
+
+
+class TwinkleTest(unittest.TestCase):
+    def test_render_same_as_alter_pixel(self):
+        twinkle = AlterTwinkle(45, 0.5, 0.8)
+        positions = np.arange(45)
+        for seconds in np.arange(0.0, 10.0, 0.1):
+            buffer = FrameBuffer(45)
+            buffer.fill(ColorConstants.WHITE)
+            twinkle.begin_frame(seconds)
+            twinkle.render(seconds, positions, buffer, LedMetadata())
+            expected = [twinkle.alter_pixel(seconds, i, ColorConstants.WHITE, LedMetadata()).tuple for i in range(45)]
+            for expected_color, actual_color in zip(expected, buffer.to_tuples()):
+                for a, b in zip(expected_color, actual_color):
+                    self.assertLessEqual(abs(a - b), 1)
+        self.assertEqual((60, AlterTwinkle.TWINKLE_SLOTS), twinkle.peak_point_seconds.shape)
+
+    def test_lights_up(self):
+        twinkle = AlterTwinkle(40, 1.0, 1.0)
+        buffer = FrameBuffer(40)
+        buffer.fill(ColorConstants.WHITE)
+        twinkle.begin_frame(0.0)
+        twinkle.render(0.0, np.arange(40), buffer, LedMetadata())
+        peaks = twinkle.peak_point_seconds.max(axis=1)
+        self.assertTrue(np.all((peaks >= 0.5) & (peaks <= 1.5)))
+
+
+class BlendTest(unittest.TestCase):
+    def test_zero_weight_not_rendered(self):
+        calls = []
+
+        class CountingAlter(AlterSolid):
+            def render(self, seconds, positions, buffer, metadata):
+                calls.append(self.color)
+                super().render(seconds, positions, buffer, metadata)
+        red = CountingAlter((255, 0, 0))
+        blue = CountingAlter((0, 0, 255))
+        blend = AlterBlend(ConstantPercentGetter(0.5), [red, blue])
+        buffer = FrameBuffer(10)
+        blend.render(0.0, np.arange(10), buffer, LedMetadata())
+        self.assertEqual([blue.color], calls)
+        self.assertEqual(blue.color, buffer.get_color(0))
+
+        blend.percent_getter = ConstantPercentGetter(0.25)
+        blend.render(1.0, np.arange(10), buffer, LedMetadata())
+        self.assertEqual([blue.color, red.color, blue.color], calls)
+        self.assertEqual((127, 0, 127), buffer.to_tuples()[0])
+
+
+class FrameBufferTest(unittest.TestCase):
+    def test_to_bytes(self):
+        buffer = FrameBuffer(4)
+        buffer.set_color(0, Color.from_bytes(200, 100, 50))
+        buffer.set_color(1, ColorConstants.WHITE)
+        buffer.set_color(3, Color.from_bytes(1, 2, 3))
+        buffer.set_color(3, None)
+        self.assertEqual([(200, 100, 50), (255, 255, 255), (0, 0, 0), (0, 0, 0)], buffer.to_tuples())
+        self.assertIsNone(buffer.get_color(2))
+
+
+class PixelOutputTest(unittest.TestCase):
+    def test_skips_unchanged_frames(self):
+        pixels = FakePixels(3)
+        output = PixelOutput(pixels)
+        buffer = FrameBuffer(3)
+        buffer.fill(ColorConstants.WHITE)
+        self.assertTrue(output.write(buffer))
+        self.assertFalse(output.write(buffer))
+        buffer.set_color(1, None)
+        self.assertTrue(output.write(buffer))
+        self.assertEqual([(255, 255, 255), (0, 0, 0), (255, 255, 255)], pixels.data)
+        self.assertEqual(2, pixels.show_count)
+        self.assertEqual(1, output.skipped_write_count)
+
+    def test_brightness(self):
+        buffer = FrameBuffer(2)
+        buffer.set_color(0, Color.from_bytes(200, 100, 50))
+        output = PixelOutput(FakePixels(2))
+        self.assertEqual([[200, 100, 50], [0, 0, 0]], output.to_bytes(buffer).tolist())
+        output.brightness = 0.5
+        self.assertEqual([[100, 50, 25], [0, 0, 0]], output.to_bytes(buffer).tolist())
+
+    def test_dither(self):
+        buffer = FrameBuffer(1)
+        buffer.fill(Color.from_bytes(255, 100, 0))
+        output = PixelOutput(FakePixels(1), brightness=0.003, dither=True)
+        frames = [output.to_bytes(buffer)[0].tolist() for _ in range(100)]
+        self.assertAlmostEqual(0.765, sum(frame[0] for frame in frames) / len(frames), delta=0.02)
+        self.assertAlmostEqual(0.3, sum(frame[1] for frame in frames) / len(frames), delta=0.02)
+        self.assertEqual(0, sum(frame[2] for frame in frames))
+
+
+class PercentTest(unittest.TestCase):
+    def test_evaluated_once_per_frame(self):
+        calls = []
+
+        def time_multiplier_getter():
+            calls.append(None)
+            return 2.0
+
+        shared_percent_getter = FrameCachedPercentGetter(BouncePercentGetter(12.0))
+        percent_getters = [PercentGetterTimeMultiplier(shared_percent_getter, time_multiplier_getter) for _ in range(3)]
+        for seconds in [1.0, 2.0]:
+            for _ in range(10):
+                for percent_getter in percent_getters:
+                    self.assertEqual(BouncePercentGetter(12.0).get_percent(seconds * 2.0), percent_getter.get_percent(seconds))
+        self.assertEqual(6, len(calls))
+
+        # begin_frame should be the only place that time_multiplier_getter is called
+        for seconds in [3.0, 4.0, 5.0]:
+            for percent_getter in percent_getters:
+                percent_getter.begin_frame(seconds)
+            self.assertEqual(6 + 3 * (seconds - 2.0), len(calls))
+            for _ in range(10):
+                for percent_getter in percent_getters:
+                    self.assertEqual(BouncePercentGetter(12.0).get_percent(seconds * 2.0), percent_getter.get_percent(seconds))
+        self.assertEqual(15, len(calls))
+
+
+class RandomTest(unittest.TestCase):
+    def test_seeded_patterns_repeat(self):
+        for message in ["star", "reverse star", "twinkle", "north red blue green"]:
+            with self.subTest(message=message):
+                frames = []
+                for _ in range(2):
+                    runner = PatternRunner(message, 450)
+                    for _ in range(400):  # long enough for northern lights to make a random change
+                        runner.render_frame()
+                    frames.append(list(runner.pixels.data))
+                self.assertEqual(frames[0], frames[1])
+
+
+class ParallelRendererTest(unittest.TestCase):
+    def test_workers_render_same_frame(self):
+        for message in ["red | blue green | rainbow", "star", "twinkle"]:
+            with self.subTest(message=message):
+                renderers = [
+                    ParallelRenderer(450, workers, partial(create_benchmark_led_states, 450), create_benchmark_setting,
+                                     np.arange(450) < START_PIXELS_TO_HIDE, seed=5)
+                    for workers in [1, 3]
+                ]
+                try:
+                    for renderer in renderers:
+                        renderer.handle_message("main", message, False)
+                    for frame in range(90):
+                        seconds = START_SECONDS + frame * FRAME_SECONDS
+                        expected, actual = [renderer.render(seconds) for renderer in renderers]
+                        np.testing.assert_array_equal(expected.valid, actual.valid)
+                        np.testing.assert_array_equal(expected.colors, actual.colors)
+                finally:
+                    for renderer in renderers:
+                        renderer.close()
+
+    def test_handle_message_returns_context(self):
+        renderer = ParallelRenderer(450, 2, partial(create_benchmark_led_states, 450), create_benchmark_setting)
+        try:
+            self.assertTrue(renderer.handle_message("main", "off", False).reset)
+            self.assertFalse(renderer.handle_message("main", "red", False).reset)
+        finally:
+            renderer.close()
+
+
+class FrameLifecycleTest(unittest.TestCase):
+    def test_begin_frame_reaches_every_alter(self):
+        frames = []
+
+        class RecordingAlter(AlterNothing):
+            def begin_frame(self, seconds):
+                frames.append(seconds)
+        setting = AlterMultiplexer([
+            AlterPartition([(RecordingAlter(), [(0, 5)])]),
+            AlterBlend(ConstantPercentGetter(0.0), [AlterSpeedOfAlter(RecordingAlter(), lambda: 2.0), RecordingAlter()]),
+        ])
+        setting.begin_frame(3.0)
+        self.assertEqual([3.0, 6.0, 3.0], frames)
+
+    def test_smooth_percent_moves_once_per_frame(self):
+        smooth = SmoothPercentGetter(ConstantPercentGetter(1.0))
+        smooth.begin_frame(0.0)
+        self.assertAlmostEqual(0.05, smooth.get_percent(0.0))
+        smooth.begin_frame(0.1)
+        for _ in range(3):
+            self.assertAlmostEqual(0.55, smooth.get_percent(0.1))
+        smooth.begin_frame(0.2)
+        self.assertAlmostEqual(1.0, smooth.get_percent(0.2))
+
+    def test_smooth_percent_moves_without_begin_frame(self):
+        smooth = SmoothPercentGetter(ConstantPercentGetter(1.0))
+        self.assertAlmostEqual(0.05, smooth.get_percent(0.0))
+        self.assertAlmostEqual(0.55, smooth.get_percent(0.1))
+        self.assertAlmostEqual(0.55, smooth.get_percent(0.1))
+
+
+class FrameSchedulerTest(unittest.TestCase):
+    def create_scheduler(self, catch_up: bool):
+        now = 0.0
+        sleeps = []
+
+        def sleep(seconds: float):
+            nonlocal now
+            sleeps.append(seconds)
+            now += seconds
+        scheduler = FrameScheduler(10.0, catch_up=catch_up, clock=lambda: now, sleep=sleep)
+
+        def render(seconds: float):
+            nonlocal now
+            now += seconds
+        return scheduler, sleeps, render
+
+    def test_sleeps_until_deadline(self):
+        scheduler, sleeps, render = self.create_scheduler(False)
+        for _ in range(5):
+            scheduler.wait()
+            render(0.03)
+        self.assertEqual(4, len(sleeps))
+        for seconds in sleeps:
+            self.assertAlmostEqual(0.07, seconds)
+        self.assertAlmostEqual(10.0, scheduler.fps)
+
+    def test_overrun(self):
+        for catch_up in [False, True]:
+            scheduler, sleeps, render = self.create_scheduler(catch_up)
+            scheduler.wait()
+            render(0.35)  # the frames at 0.1 and 0.2 are missed
+            scheduler.wait()
+            render(0.0)
+            scheduler.wait()
+            if catch_up:
+                self.assertEqual(0, scheduler.skipped_frames)
+                self.assertEqual([], sleeps)
+            else:
+                self.assertEqual(2, scheduler.skipped_frames)
+                self.assertEqual(1, len(sleeps))
+
+
+class SlackHelperTest(unittest.TestCase):
+    def test_reconnects_after_any_error(self):
+        class FakeSocketModeClient:
+            def __init__(self, app_token, web_client):
+                self.socket_mode_request_listeners = []
+                self.connect_count = 0
+
+            def is_connected(self):
+                return self.connect_count >= 2
+
+            def connect(self):
+                self.connect_count += 1
+                if self.connect_count == 1:
+                    raise socket.gaierror("Name or service not known")
+
+            def close(self):
+                pass
+        with mock.patch("led_machine.slack.SocketModeClient", FakeSocketModeClient), mock.patch("led_machine.slack.MIN_RECONNECT_DELAY", 0.01):
+            helper = SlackHelper("xoxb-token", "xapp-token", "channel")
+            try:
+                for _ in range(200):
+                    if helper.socket_client.is_connected():
+                        break
+                    time.sleep(0.01)
+                self.assertEqual(2, helper.socket_client.connect_count)
+                self.assertTrue(helper.connection_thread.is_alive())
+            finally:
+                helper.close()
+
 
 if __name__ == '__main__':
     unittest.main()
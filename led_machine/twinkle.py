@@ -1,80 +1,70 @@
 import math
-import random
-from typing import List, Optional, Dict
+from typing import Optional
 
-from led_machine.alter import Alter, Position, LedMetadata
-from led_machine.color import Color, ColorConstants
-
-
-class Twinkle:
-    def __init__(self, peak_point_seconds: float, fade_duration_seconds: float):
-        self.peak_point_seconds = peak_point_seconds
-        self.fade_duration_seconds = fade_duration_seconds
+import numpy as np
 
-    def get_brightness(self, seconds: float) -> float:
-        distance = abs(seconds - self.peak_point_seconds)
-        return max(0.0, 1 - distance / self.fade_duration_seconds)
-
-    def is_stale(self, seconds: float) -> bool:
-        return self.peak_point_seconds + self.fade_duration_seconds < seconds
+from led_machine.alter import Alter, Position, LedMetadata
+from led_machine.color import Color
+from led_machine.frame import FrameBuffer
+from led_machine.randomness import get_random
 
 
 class AlterTwinkle(Alter):
     SECTION_LENGTH = 20
+    FADE_DURATION_SECONDS = 0.3
+    TWINKLE_SLOTS = 3
+    """
+    The number of twinkles each pixel can have at once. Each call to randomize replaces the oldest slot. Since randomize is called at most once a second,
+    and a twinkle is over 1.8 seconds after randomize created it, older twinkles are always stale.
+    """
 
     def __init__(self, number_of_pixels: int, min_percent_to_light_up: float, max_percent_to_light_up: float):
         self.number_of_pixels: int = number_of_pixels
         self.last_update: Optional[float] = None
         self.min_percent_to_light_up = min_percent_to_light_up
         self.max_percent_to_light_up = max_percent_to_light_up
-        self.twinkle_map: Dict[Position, List[Twinkle]] = {}
+        self.number_of_sections = int(math.ceil(self.number_of_pixels / self.__class__.SECTION_LENGTH))
+        self.peak_point_seconds = np.full((self.number_of_sections * self.__class__.SECTION_LENGTH, self.__class__.TWINKLE_SLOTS), -np.inf)
+        """The time each twinkle is brightest at for each pixel. -inf means that slot has no twinkle."""
+        self.next_slot = 0
+        self.random = get_random()
 
     def randomize(self, current_seconds: float):
-        number_of_sections = int(math.ceil(self.number_of_pixels / self.__class__.SECTION_LENGTH))
-        for section_index in range(number_of_sections):
-            pixel_index_start = section_index * self.__class__.SECTION_LENGTH
-            pixel_index_end = pixel_index_start + self.__class__.SECTION_LENGTH  # (Exclusive)
-            indices = list(range(pixel_index_start, pixel_index_end))
-            random.shuffle(indices)
-            number_to_light_up = random.randint(
-                round(self.__class__.SECTION_LENGTH * self.min_percent_to_light_up),
-                round(self.__class__.SECTION_LENGTH * self.max_percent_to_light_up)
-            )
-            for pixel_index in indices[0:number_to_light_up]:
-                key = pixel_index
-                time_offset = random.uniform(0.5, 1.5)
-                peak_point_seconds = current_seconds + time_offset
-                if key in self.twinkle_map:
-                    twinkle_list = self.twinkle_map[key]
-                else:
-                    twinkle_list = []
-                    self.twinkle_map[key] = twinkle_list
-                twinkle_list.append(Twinkle(peak_point_seconds, 0.3))
+        section_length = self.__class__.SECTION_LENGTH
+        number_to_light_up = self.random.integers(
+            round(section_length * self.min_percent_to_light_up),
+            round(section_length * self.max_percent_to_light_up),
+            endpoint=True, size=(self.number_of_sections, 1)
+        )
+        shuffled_indices = self.random.permuted(np.tile(np.arange(section_length), (self.number_of_sections, 1)), axis=1)
+        light_up = (shuffled_indices < number_to_light_up).reshape(-1)
+        time_offsets = self.random.uniform(0.5, 1.5, size=len(light_up))
+        self.peak_point_seconds[:, self.next_slot] = np.where(light_up, current_seconds + time_offsets, -np.inf)
+        self.next_slot = (self.next_slot + 1) % self.__class__.TWINKLE_SLOTS
 
-    def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
+    def begin_frame(self, seconds: float) -> None:
         if self.last_update is not None and self.last_update > seconds:  # someone changed the speed on us, so just reset and update no matter what
             self.last_update = None
         if self.last_update is None or self.last_update + 1 < seconds:
             self.last_update = seconds
             self.randomize(seconds)
 
+    def _get_brightness(self, seconds: float, pixel_indices) -> np.ndarray:
+        distance = np.abs(seconds - self.peak_point_seconds[pixel_indices])
+        return np.maximum(0.0, 1 - distance / self.__class__.FADE_DURATION_SECONDS).max(axis=-1)
+
+    def alter_pixel(self, seconds: float, pixel_position: Position, current_color: Optional[Color], metadata: LedMetadata) -> Optional[Color]:
         if current_color is None:
             return None
 
-        key = pixel_position
-        twinkle_list = self.twinkle_map.get(key)
-        if twinkle_list is None:
-            return ColorConstants.BLACK
-        to_remove = []
         max_brightness = 0.0
-        for twinkle in twinkle_list:
-            if twinkle.is_stale(seconds):
-                to_remove.append(twinkle)
-            brightness = twinkle.get_brightness(seconds)
-            max_brightness = max(max_brightness, brightness)
-
-        for twinkle in to_remove:
-            twinkle_list.remove(twinkle)
-
+        if pixel_position in range(len(self.peak_point_seconds)):
+            max_brightness = float(self._get_brightness(seconds, int(pixel_position)))
         return (current_color * max_brightness).color()
 
+    def render(self, seconds: float, positions: np.ndarray, buffer: FrameBuffer, metadata: LedMetadata) -> None:
+        # positions that never twinkle are black
+        has_twinkles = (positions >= 0) & (positions < len(self.peak_point_seconds)) & (positions % 1 == 0)
+        brightness = np.zeros(len(positions))
+        brightness[has_twinkles] = self._get_brightness(seconds, positions[has_twinkles].astype(int))
+        buffer.colors *= brightness[:, np.newaxis]
@@ -1,3 +1,6 @@
 from typing import Callable
 
 TimeMultiplierGetter = Callable[[], float]
+
+STOPPED_TIME_MULTIPLIER = 1e-6
+"""A time multiplier at or below this value makes time move so slowly that patterns can be considered to not move at all"""
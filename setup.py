@@ -12,5 +12,6 @@ setup(
                                       ]},
     install_requires=["adafruit-circuitpython-neopixel",
                       "slack_sdk",
+                      "numpy",
                       ]
 )